@@ -62,7 +62,8 @@ class LLMConfig(BaseModel):
 class MCPRetryConfig(BaseModel):
     """Retry configuration for MCP connections."""
     max_attempts: int = 2  # Total attempts (1 initial + 1 retry)
-    delay_seconds: float = 1.0  # Wait between retries
+    delay_seconds: float = 1.0  # Base wait between retries (doubles each attempt, jittered)
+    max_delay_seconds: float = 30.0  # Cap on a single backoff wait
     connection_max_age_seconds: int = 600  # Force refresh after 10 min
 
 
@@ -18,6 +18,7 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import declarative_base
 from sqlalchemy import text
+import orjson
 import redis.asyncio as redis
 
 from app.config import settings
@@ -30,6 +31,11 @@ from app.utils.logger import logger
 Base = declarative_base()
 
 
+def _json_serializer(value) -> str:
+    """orjson for JSON/JSONB binds; non-str keys are stringified like json.dumps does."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # ============================================================
 # Global Database Objects
 # ============================================================
@@ -69,6 +75,8 @@ async def init_db() -> None:
             pool_pre_ping=True,  # Verify connections before using
             pool_recycle=3600,   # Recycle connections after 1 hour
             connect_args={"ssl": False},  # Disable SSL for local development
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
         )
         
         # Create session factory
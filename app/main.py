@@ -190,8 +190,11 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         asyncio.create_task(health_check_loop())
         asyncio.create_task(hot_reload_loop())
         
-        # Start MCP Coordinator
-        logger.info("🎯 Starting MCP Coordinator...")
+        # Start MCP Coordinator (uvicorn's loop=auto runs it on uvloop when installed)
+        logger.info(
+            "🎯 Starting MCP Coordinator...",
+            event_loop=type(asyncio.get_running_loop()).__module__,
+        )
         await start_mcp_coordinator()
         
         # Start Phase 2 services
@@ -310,10 +313,19 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         from app.services.prompt_guard_config_cache import stop_config_listener
         await stop_config_listener()
         logger.info("✅ Prompt Guard Config Listener stopped")
+
+        # Close the shared Redis pub/sub connection
+        from app.services.pubsub_hub import close_pubsub_hub
+        await close_pubsub_hub()
+        
+        # Close LLM HTTP pool
+        from app.services.llm_service import close_llm_service
+        await close_llm_service()
+        logger.info("✅ LLM client closed")
         
         # Close MCP connections
         mcp_registry = get_mcp_registry()
-        await mcp_registry.close_all()
+        await mcp_registry.aclose()
         logger.info("✅ MCP connections closed")
         
         # Close database connections
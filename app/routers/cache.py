@@ -10,6 +10,7 @@ from typing import Optional
 from pydantic import BaseModel
 
 from app.services import auth_client
+from app.services.mcp_gateway_session_cache import get_session_cache
 from app.utils.logger import logger
 
 router = APIRouter(prefix="/cache", tags=["cache"])
@@ -42,6 +43,10 @@ async def invalidate_cache(request: InvalidateRequest):
         email=request.email
     )
     
+    # Permissions may have changed - drop gateway sessions in every worker
+    if request.user_id is not None:
+        get_session_cache().invalidate_user(request.user_id)
+    
     logger.info(f"Cache invalidated: {result}")
     return {"status": "ok", "invalidated": result}
 
@@ -58,6 +63,7 @@ async def invalidate_user_by_id(user_id: int):
         Invalidation status
     """
     result = auth_client.invalidate_user_cache(user_id=user_id)
+    get_session_cache().invalidate_user(user_id)
     logger.info(f"Cache invalidated for user {user_id}: {result}")
     return {"status": "ok", "user_id": user_id, "invalidated": result}
 
@@ -7,6 +7,7 @@ LLM-powered chat interface for intelligent MCP routing.
 import time
 import json
 import math
+import orjson
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Depends, Request
@@ -26,6 +27,11 @@ from app.utils.logger import logger
 router = APIRouter(prefix="/api/v1/chat")
 
 
+def _sse(event: str, data: dict) -> bytes:
+    """Encode one server-sent event frame, serializing the payload once with orjson."""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
 # ============================================================
 # Request/Response Models
 # ============================================================
@@ -411,11 +417,9 @@ async def ask_question_stream(
             # Send welcome message
             welcome_text = welcome['message']
             for char in welcome_text:
-                payload = json.dumps({"text": char})
-                yield f"event: token\ndata: {payload}\n\n"
+                yield _sse("token", {"text": char})
             
-            newline_payload = json.dumps({"text": "\n\n"})
-            yield f"event: token\ndata: {newline_payload}\n\n"
+            yield _sse("token", {"text": "\n\n"})
             
             # Stream LLM response
             async for event in llm_service.ask_stream(
@@ -426,9 +430,7 @@ async def ask_question_stream(
                 tool_restrictions=context['tool_restrictions'],
             ):
                 if event.get("type") == "token":
-                    text = event.get("text", "")
-                    payload = json.dumps({"text": text})
-                    yield f"event: token\ndata: {payload}\n\n"
+                    yield _sse("token", {"text": event.get("text", "")})
                 elif event.get("type") == "tool_call":
                     async for db in get_db():
                         await flow_tracker.log_event(
@@ -447,20 +449,20 @@ async def ask_question_stream(
                         )
                         await flow_tracker.save_to_db(session_id, user_id, db, source="chat")
                         break
-                    yield f"event: done\ndata: {json.dumps(result)}\n\n"
+                    yield _sse("done", result)
                 elif event.get("type") == "error":
                     async for db in get_db():
                         await flow_tracker.log_event(session_id, user_id, "error", db=db, error=event.get('error'))
                         await flow_tracker.save_to_db(session_id, user_id, db, source="chat")
                         break
-                    yield f"event: error\ndata: {json.dumps({'error': event.get('error', 'Streaming error')})}\n\n"
+                    yield _sse("error", {"error": event.get("error", "Streaming error")})
                     return
         except Exception as e:
             async for db in get_db():
                 await flow_tracker.log_event(session_id, user_id, "error", db=db, error=str(e))
                 await flow_tracker.save_to_db(session_id, user_id, db, source="chat")
                 break
-            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            yield _sse("error", {"error": str(e)})
 
     return StreamingResponse(
         event_stream(),
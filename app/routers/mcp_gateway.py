@@ -13,7 +13,7 @@ from typing import Optional
 import json
 from sqlalchemy import text
 
-from app.services.mcp_permission_service import get_mcp_permission_service, MCPPermissionService
+from app.services.mcp_permission_service import get_mcp_permission_service, MCPPermissionService, build_checker
 from app.services.mcp_registry import get_mcp_registry
 from app.services.mcp_gateway_session_cache import get_session_cache
 from app.database import get_db
@@ -46,6 +46,8 @@ async def validate_mcp_token(token: str) -> dict:
                 return None
             
             user_context = response.json()
+            # Restrictions are compiled once per token, not per request
+            user_context["permissions"] = build_checker(user_context.get("tool_restrictions"))
             
             # Cache the user context (reuse existing session cache)
             # Note: We pass empty lists for available_mcps and filtered_tools
@@ -114,7 +116,7 @@ async def mcp_gateway(
     # Parse JSON-RPC request
     try:
         body = await request.json()
-    except:
+    except ValueError:
         return {"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": None}
     
     method = body.get("method")
@@ -158,7 +160,7 @@ async def mcp_gateway(
         
         # Cache miss - build tools list
         mcp_access = user_context.get("mcp_access", [])
-        tool_restrictions = user_context.get("tool_restrictions", {})
+        permissions = user_context["permissions"]
         
         logger.info(f"Cache miss - building tools list for user {user_context['user_id']}")
         
@@ -175,7 +177,7 @@ async def mcp_gateway(
             mcp_tools = mcp_tools_dict.get(mcp_name, [])
             
             # Filter tools by user permissions
-            filtered_tools = mcp_permission_service.filter_tools(mcp_name, mcp_tools, tool_restrictions)
+            filtered_tools = permissions.filter_tools(mcp_name, mcp_tools)
             
             # Add to result with MCP prefix
             for tool in filtered_tools:
@@ -215,7 +217,7 @@ async def mcp_gateway(
     # Handle prompts/list
     if method == "prompts/list":
         mcp_access = user_context.get("mcp_access", [])
-        tool_restrictions = user_context.get("tool_restrictions", {})
+        permissions = user_context["permissions"]
         
         available_mcps = await mcp_permission_service.get_available_mcps(mcp_access)
         registry = get_mcp_registry()
@@ -225,7 +227,7 @@ async def mcp_gateway(
             mcp_name = mcp["name"]
             mcp_prompts_dict = registry.get_prompts(mcp_name)
             mcp_prompts = mcp_prompts_dict.get(mcp_name, [])
-            filtered_prompts = mcp_permission_service.filter_prompts(mcp_name, mcp_prompts, tool_restrictions)
+            filtered_prompts = permissions.filter_prompts(mcp_name, mcp_prompts)
             
             for prompt in filtered_prompts:
                 prompt_data = {
@@ -245,7 +247,7 @@ async def mcp_gateway(
     # Handle resources/list
     if method == "resources/list":
         mcp_access = user_context.get("mcp_access", [])
-        tool_restrictions = user_context.get("tool_restrictions", {})
+        permissions = user_context["permissions"]
         
         available_mcps = await mcp_permission_service.get_available_mcps(mcp_access)
         registry = get_mcp_registry()
@@ -255,7 +257,7 @@ async def mcp_gateway(
             mcp_name = mcp["name"]
             mcp_resources_dict = registry.get_resources(mcp_name)
             mcp_resources = mcp_resources_dict.get(mcp_name, [])
-            filtered_resources = mcp_permission_service.filter_resources(mcp_name, mcp_resources, tool_restrictions)
+            filtered_resources = permissions.filter_resources(mcp_name, mcp_resources)
             
             for resource in filtered_resources:
                 all_resources.append({
@@ -287,7 +289,7 @@ async def mcp_gateway(
         
         try:
             registry = get_mcp_registry()
-            client = registry.mcps.get(mcp_name)
+            client = registry.get_client(mcp_name)
             
             if not client:
                 return {
@@ -327,7 +329,7 @@ async def mcp_gateway(
         
         try:
             registry = get_mcp_registry()
-            client = registry.mcps.get(mcp_name)
+            client = registry.get_client(mcp_name)
             
             if not client:
                 return {
@@ -374,11 +376,13 @@ async def mcp_gateway(
         
         mcp_name, actual_tool_name = tool_name.split("__", 1)
         
-        # Check permission to call this tool
-        if not mcp_permission_service.can_call_tool(
+        # Check permission to call this tool - tools listed for this session
+        # were already permission-filtered, so a set hit skips the rule check
+        cached_session = get_session_cache().get(token)
+        session_allowed = cached_session is not None and tool_name in cached_session.allowed
+        if not session_allowed and not user_context["permissions"].can_call_tool(
             mcp_name,
-            actual_tool_name,
-            user_context.get("tool_restrictions", {})
+            actual_tool_name
         ):
             return {
                 "jsonrpc": "2.0",
@@ -391,7 +395,7 @@ async def mcp_gateway(
             registry = get_mcp_registry()
             
             # Get the MCP client directly
-            client = registry.mcps.get(mcp_name)
+            client = registry.get_client(mcp_name)
             if not client:
                 return {
                     "jsonrpc": "2.0",
@@ -13,7 +13,7 @@ import httpx
 from typing import Optional
 from sqlalchemy import text
 
-from app.services.mcp_permission_service import get_mcp_permission_service, MCPPermissionService
+from app.services.mcp_permission_service import get_mcp_permission_service, MCPPermissionService, build_checker
 from app.services.mcp_registry import get_mcp_registry
 from app.services.mcp_gateway_session_cache import get_session_cache
 from app.services.flow_tracker import get_flow_tracker, FlowTracker
@@ -46,6 +46,8 @@ async def validate_mcp_token(token: str) -> dict:
                 return None
             
             user_context = response.json()
+            # Restrictions are compiled once per token, not per request
+            user_context["permissions"] = build_checker(user_context.get("tool_restrictions"))
             
             session_cache.set(
                 token=token,
@@ -86,7 +88,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
     # Handle tools/list
     elif method == "tools/list":
         mcp_access = user_context.get("mcp_access", [])
-        tool_restrictions = user_context.get("tool_restrictions", {})
+        permissions = user_context["permissions"]
         
         available_mcps = await mcp_permission_service.get_available_mcps(mcp_access)
         registry = get_mcp_registry()
@@ -94,7 +96,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
         for mcp in available_mcps:
             mcp_name = mcp["name"]
             mcp_tools = registry.get_tools(mcp_name).get(mcp_name, [])
-            filtered_tools = mcp_permission_service.filter_tools(mcp_name, mcp_tools, tool_restrictions)
+            filtered_tools = permissions.filter_tools(mcp_name, mcp_tools)
             for tool in filtered_tools:
                 all_tools.append({
                     "name": f"{mcp_name}__{tool['name']}",
@@ -109,7 +111,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
     # Handle prompts/list
     elif method == "prompts/list":
         mcp_access = user_context.get("mcp_access", [])
-        tool_restrictions = user_context.get("tool_restrictions", {})
+        permissions = user_context["permissions"]
         
         available_mcps = await mcp_permission_service.get_available_mcps(mcp_access)
         registry = get_mcp_registry()
@@ -117,7 +119,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
         for mcp in available_mcps:
             mcp_name = mcp["name"]
             mcp_prompts = registry.get_prompts(mcp_name).get(mcp_name, [])
-            filtered_prompts = mcp_permission_service.filter_prompts(mcp_name, mcp_prompts, tool_restrictions)
+            filtered_prompts = permissions.filter_prompts(mcp_name, mcp_prompts)
             for prompt in filtered_prompts:
                 prompt_data = {
                     "name": f"{mcp_name}__{prompt['name']}",
@@ -137,7 +139,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
     # Handle resources/list
     elif method == "resources/list":
         mcp_access = user_context.get("mcp_access", [])
-        tool_restrictions = user_context.get("tool_restrictions", {})
+        permissions = user_context["permissions"]
         
         available_mcps = await mcp_permission_service.get_available_mcps(mcp_access)
         registry = get_mcp_registry()
@@ -145,7 +147,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
         for mcp in available_mcps:
             mcp_name = mcp["name"]
             mcp_resources = registry.get_resources(mcp_name).get(mcp_name, [])
-            filtered_resources = mcp_permission_service.filter_resources(mcp_name, mcp_resources, tool_restrictions)
+            filtered_resources = permissions.filter_resources(mcp_name, mcp_resources)
             
             for resource in filtered_resources:
                 uri_str = str(resource['uri'])
@@ -174,7 +176,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
             
             try:
                 registry = get_mcp_registry()
-                client = registry.mcps.get(mcp_name)
+                client = registry.get_client(mcp_name)
                 if not client:
                     response = {"jsonrpc": "2.0", "error": {"code": -32603, "message": "MCP not available"}, "id": request_id}
                     yield json.dumps(response) + "\n"
@@ -200,7 +202,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
         else:
             mcp_name, actual_tool_name = tool_name.split("__", 1)
             
-            can_call = mcp_permission_service.can_call_tool(mcp_name, actual_tool_name, user_context.get("tool_restrictions", {}))
+            can_call = user_context["permissions"].can_call_tool(mcp_name, actual_tool_name)
             if not can_call:
                 logger.warning("Tool call denied", user_id=user_context['user_id'], tool=f"{mcp_name}__{actual_tool_name}")
                 response = {"jsonrpc": "2.0", "error": {"code": -32603, "message": "Permission denied"}, "id": request_id}
@@ -208,7 +210,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
             else:
                 try:
                     registry = get_mcp_registry()
-                    client = registry.mcps.get(mcp_name)
+                    client = registry.get_client(mcp_name)
                     if not client:
                         response = {"jsonrpc": "2.0", "error": {"code": -32603, "message": "MCP not available"}, "id": request_id}
                         yield json.dumps(response) + "\n"
@@ -252,7 +254,7 @@ async def streamable_generator(user_context: dict, body: dict, mcp_permission_se
                 yield json.dumps(response) + "\n"
             else:
                 try:
-                    client = registry.mcps.get(mcp_name)
+                    client = registry.get_client(mcp_name)
                     result = await client.read_resource(uri)
                     contents = [{"uri": uri, "mimeType": str(c.mimeType) if hasattr(c, 'mimeType') else "text/plain", "text": c.text} for c in result.contents]
                     response = {"jsonrpc": "2.0", "result": {"contents": contents}, "id": request_id}
@@ -324,7 +326,7 @@ async def mcp_gateway_v2(
     # Parse JSON-RPC request
     try:
         body = await request.json()
-    except:
+    except ValueError:
         raise HTTPException(400, "Invalid JSON")
     
     session_id = str(uuid4())
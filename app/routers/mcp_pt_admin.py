@@ -238,16 +238,8 @@ async def get_available_mcps(db: AsyncSession = Depends(get_db)) -> List[Dict[st
             "SELECT name, url, is_active FROM omni2.mcp_servers ORDER BY name"
         )
     )
-    rows = result.fetchall()
-    
-    return [
-        {
-            "name": row.name,
-            "url": row.url,
-            "is_active": row.is_active,
-        }
-        for row in rows
-    ]
+    # The SELECT already yields exactly the response keys
+    return [dict(row) for row in result.mappings()]
 
 
 @router.delete("/scans/{scan_id}")
@@ -14,11 +14,13 @@ from sqlalchemy import select
 from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field, field_validator
 import httpx
+import orjson
 import asyncio
 
 from app.database import get_db
 from app.models import MCPServer
 from app.services.mcp_registry import get_mcp_registry
+from app.services.mcp_permission_service import invalidate_mcp_catalog
 from app.utils.logger import logger
 
 router = APIRouter(prefix="/mcp/servers")
@@ -173,22 +175,17 @@ async def test_mcp_connection(
                     if test_response.status_code == 200:
                         # Try to get tools count from initialize response
                         try:
-                            init_data = test_response.json()
-                            print(f"\n=== MCP INITIALIZE RESPONSE ===")
-                            print(f"Full init response: {init_data}")
+                            init_data = orjson.loads(test_response.content)
                             
                             if 'result' in init_data and 'capabilities' in init_data['result']:
                                 server_caps = init_data['result']['capabilities']
-                                print(f"Server capabilities: {server_caps}")
                                 # If server supports tools capability, show estimated count
                                 tools_count = 1 if 'tools' in server_caps else 0
-                                print(f"Tools capability detected: {'tools' in server_caps}, count: {tools_count}")
                             else:
                                 tools_count = 0
-                                print(f"No capabilities found, tools_count: {tools_count}")
-                            print(f"=== END MCP INITIALIZE ===\n")
+                            logger.debug("MCP initialize response", url=test_url, tools_count=tools_count)
                         except Exception as e:
-                            print(f"Error parsing init response: {e}")
+                            logger.debug("Failed to parse MCP initialize response", url=test_url, error=str(e))
                             tools_count = 0
                         
                         return MCPDiscoveryResponse(
@@ -250,7 +247,7 @@ async def test_mcp_connection(
                     try:
                         tools_response = await client.get(f"{base_url}/tools", headers=headers)
                         if tools_response.status_code == 200:
-                            tools_data = tools_response.json()
+                            tools_data = orjson.loads(tools_response.content)
                             capabilities['tools'] = tools_data
                             tools_count = len(tools_data.get('tools', []))
                     except:
@@ -260,7 +257,7 @@ async def test_mcp_connection(
                     try:
                         prompts_response = await client.get(f"{base_url}/prompts", headers=headers)
                         if prompts_response.status_code == 200:
-                            prompts_data = prompts_response.json()
+                            prompts_data = orjson.loads(prompts_response.content)
                             capabilities['prompts'] = prompts_data
                             prompts_count = len(prompts_data.get('prompts', []))
                     except:
@@ -270,7 +267,7 @@ async def test_mcp_connection(
                     try:
                         resources_response = await client.get(f"{base_url}/resources", headers=headers)
                         if resources_response.status_code == 200:
-                            resources_data = resources_response.json()
+                            resources_data = orjson.loads(resources_response.content)
                             capabilities['resources'] = resources_data
                             resources_count = len(resources_data.get('resources', []))
                     except:
@@ -329,14 +326,6 @@ async def discover_mcp_server(request: MCPDiscoveryRequest) -> MCPDiscoveryRespo
                 success=result.success, 
                 tools=result.tools_count)
     
-    print(f"\n=== OMNI2 DISCOVERY RESPONSE ===")
-    print(f"URL: {request.url}")
-    print(f"Protocol: {request.protocol}")
-    print(f"Success: {result.success}")
-    print(f"Tools Count: {result.tools_count}")
-    print(f"Full Response: {result.model_dump()}")
-    print(f"=== END OMNI2 DISCOVERY ===\n")
-    
     return result
 
 @router.post("")
@@ -369,6 +358,7 @@ async def create_mcp_server(
         
         db.add(new_server)
         await db.commit()
+        invalidate_mcp_catalog()
         await db.refresh(new_server)
         
         logger.info("✅ MCP server created", name=server.name, id=new_server.id)
@@ -423,6 +413,7 @@ async def update_mcp_server(
             setattr(server, field, value)
         
         await db.commit()
+        invalidate_mcp_catalog()
         await db.refresh(server)
         
         logger.info("✅ MCP server updated", server_id=server_id, name=server.name)
@@ -468,6 +459,7 @@ async def delete_mcp_server(
         from sqlalchemy import delete
         await db.execute(delete(MCPServer).where(MCPServer.id == server_id))
         await db.commit()
+        invalidate_mcp_catalog()
         
         logger.info("✅ MCP server deleted", server_id=server_id, name=server_name)
         
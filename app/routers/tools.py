@@ -47,6 +47,8 @@ class ToolCallResponse(BaseModel):
 @router.get("/list")
 async def list_tools(
     server: Optional[str] = None,
+    refresh: bool = False,
+    cache_only: bool = False,
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -54,16 +56,18 @@ async def list_tools(
     
     Args:
         server: Optional server name to filter by
+        refresh: Force a tools/list fetch instead of using the TTL cache
+        cache_only: Only return cached catalogs, never fetch from the MCPs
         db: Database session
         
     Returns:
         Dict with tools grouped by server
     """
     try:
-        logger.info("📋 Listing MCP tools", server_filter=server)
+        logger.info("📋 Listing MCP tools", server_filter=server, refresh=refresh)
         
         mcp_registry = get_mcp_registry()
-        tools = mcp_registry.get_tools(server)
+        tools = await mcp_registry.list_tools(server, force_refresh=refresh, cache_only=cache_only)
         
         return {
             "success": True,
@@ -92,19 +96,10 @@ async def call_tool(
     """
     try:
         logger.info("🔧 Executing MCP tool", server=request.server, tool=request.tool, arguments=request.arguments)
-        print(f"\n=== MCP TOOL EXECUTION ===")
-        print(f"Server: {request.server}")
-        print(f"Tool: {request.tool}")
-        print(f"Arguments: {request.arguments}")
         
         mcp_registry = get_mcp_registry()
-        print(f"Calling MCP registry...")
-        
         result = await mcp_registry.call_tool(request.server, request.tool, request.arguments)
         
-        print(f"MCP Result: {result}")
-        print(f"=== END MCP EXECUTION ===\n")
-        
         if result.get("status") == "error":
             logger.error("❌ MCP tool returned error", server=request.server, tool=request.tool, error=result.get("error"))
             raise HTTPException(status_code=500, detail=result.get("error"))
@@ -122,11 +117,6 @@ async def call_tool(
         raise
     except Exception as e:
         logger.error("❌ Failed to execute tool", server=request.server, tool=request.tool, error=str(e))
-        print(f"\n=== MCP EXECUTION ERROR ===")
-        print(f"Server: {request.server}")
-        print(f"Tool: {request.tool}")
-        print(f"Error: {str(e)}")
-        print(f"=== END ERROR ===\n")
         raise HTTPException(status_code=500, detail=f"Tool execution failed: {str(e)}")
 
 
@@ -274,7 +264,7 @@ async def list_mcp_servers(
             
             if include_health and mcp.status == 'active':
                 try:
-                    health = await mcp_registry.health_check(mcp.name, db)
+                    health = await mcp_registry.health_check(mcp.name, db, allow_cached=True)
                     server_info["health"] = health
                 except:
                     pass
@@ -399,10 +389,13 @@ async def get_all_mcp_capabilities(
         servers_to_query = [server] if server else loaded_mcps
         result = {}
         
+        now = time.time()
         for mcp_name in servers_to_query:
-            tools = mcp_registry.get_tools(mcp_name).get(mcp_name, [])
-            prompts = mcp_registry.get_prompts(mcp_name).get(mcp_name, [])
-            resources = mcp_registry.get_resources(mcp_name).get(mcp_name, [])
+            entry = mcp_registry.entries.get(mcp_name)
+            # Servers without a loaded entry are still listed, with zero counts
+            tools, prompts, resources = (
+                (entry.tools, entry.prompts, entry.resources) if entry else ([], [], [])
+            )
             result[mcp_name] = {
                 "tools": tools,
                 "prompts": prompts,
@@ -411,7 +404,7 @@ async def get_all_mcp_capabilities(
                     "tool_count": len(tools),
                     "prompt_count": len(prompts),
                     "resource_count": len(resources),
-                    "connection_age_seconds": int(time.time() - mcp_registry.connected_at.get(mcp_name, time.time()))
+                    "connection_age_seconds": int(now - entry.connected_at) if entry else 0
                 }
             }
         
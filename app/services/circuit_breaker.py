@@ -99,6 +99,19 @@ class CircuitBreaker:
         
         return False
     
+    def snapshot_open(self) -> frozenset:
+        """Names of MCPs that should fast-fail right now.
+        
+        Only non-closed circuits are examined, so a reload tick pays for
+        the MCPs that are failing rather than for every MCP.
+        """
+        if not self.enabled:
+            return frozenset()
+        return frozenset(
+            name for name, state in list(self.states.items())
+            if state != self.CLOSED and self.is_open(name)
+        )
+    
     def record_success(self, mcp_name: str):
         """Record successful call - close circuit."""
         old_state = self.states.get(mcp_name, self.CLOSED)
@@ -5,8 +5,11 @@ Handles communication with Claude (Anthropic) for intelligent MCP routing.
 """
 
 from typing import Dict, List, Optional, Any, AsyncGenerator
+import asyncio
 import os
+import re
 import anthropic
+import httpx
 from anthropic.types import Message, ToolUseBlock, TextBlock
 
 from app.config import settings
@@ -14,6 +17,13 @@ from app.services.mcp_registry import get_mcp_registry
 from app.services.user_service import get_user_service
 from app.utils.logger import logger
 
+# Running summary of compacted tool turns, kept as one block on the first message
+_SUMMARY_PREFIX = "[prior context summary]"
+_SUMMARY_RE = re.compile(
+    re.escape(_SUMMARY_PREFIX) + r": (\d+) earlier tool turn\(s\) omitted\. Tools called: (.*)\.",
+    re.DOTALL,
+)
+
 
 class LLMService:
     """Service for LLM-powered MCP routing and question answering."""
@@ -31,12 +41,20 @@ class LLMService:
             )
         
         self.client = anthropic.Anthropic(api_key=api_key)
-        self.async_client = None
-        if hasattr(anthropic, "AsyncAnthropic"):
-            try:
-                self.async_client = anthropic.AsyncAnthropic(api_key=api_key)
-            except Exception:
-                self.async_client = None
+        # Streaming always goes through the async client so it never blocks the event loop.
+        # One pooled HTTP client is shared by all concurrent requests for the process lifetime.
+        self.async_client = anthropic.AsyncAnthropic(
+            api_key=api_key,
+            max_retries=2,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_keepalive_connections=64,
+                    max_connections=128,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=httpx.Timeout(120.0, connect=5.0),
+            ),
+        )
         self.model = settings.llm.model  # Use from settings, not os.getenv
         self.max_tokens = settings.llm.max_tokens  # Use from settings
         self.mcp_registry = get_mcp_registry()
@@ -50,6 +68,22 @@ class LLMService:
         # make this conditional based on provider type.
         self.use_prompt_caching = True
         
+        # Claude tool name -> (mcp_name, tool_name, "mcp.tool"), filled when tools are built
+        self._tool_name_index: Dict[str, tuple] = {}
+        
+        # Streamed tokens are coalesced into batches to cut per-event overhead
+        self.stream_batch_max_tokens = 8
+        self.stream_batch_max_ms = 25
+        
+        # Tool output is fed back on every later iteration - cap its size
+        self.max_tool_result_chars = 16_000
+        
+        # Conversation history window for the agentic loop; older tool turns are
+        # collapsed into a summary once either limit is exceeded
+        self.max_history_messages = 20
+        self.context_budget_tokens = 100_000
+        self.history_keep_turns = 3
+        
     async def build_system_prompt(self, user_id: str, is_admin_dashboard: bool = False) -> str:
         """
         Build dynamic system prompt based on user's permissions.
@@ -97,9 +131,9 @@ class LLMService:
                     all_tool_names = [t["name"] for t in all_tools_in_mcp]
                     
                     # Apply tool-level permissions
-                    allowed_tool_names = await self.user_service.get_user_allowed_tools(
+                    allowed_tool_names = frozenset(await self.user_service.get_user_allowed_tools(
                         user_id, mcp_name, all_tool_names
-                    )
+                    ))
                     
                     # Filter tools by user permissions
                     for tool in all_tools_in_mcp:
@@ -338,6 +372,7 @@ AVAILABLE TOOLS:
                         continue
                     
                     logger.debug(f"[TOOL] Building tool: {combined_name} (from {mcp_name}.{tool_name})")
+                    self._tool_name_index[combined_name] = (mcp_name, tool_name, f"{mcp_name}.{tool_name}")
                     claude_tools.append({
                         "name": combined_name,
                         "description": f"[{mcp_name}] {tool['description']}",
@@ -373,8 +408,9 @@ AVAILABLE TOOLS:
                     for tool in all_tools:
                         tools_catalog.append({"mcp": mcp_name, "name": tool["name"], "description": tool["description"]})
                 elif len(allowed_tools) > 0:
+                    allowed_names = frozenset(allowed_tools)
                     for tool in all_tools:
-                        if tool["name"] in allowed_tools:
+                        if tool["name"] in allowed_names:
                             tools_catalog.append({"mcp": mcp_name, "name": tool["name"], "description": tool["description"]})
         
         return tools_catalog
@@ -399,6 +435,7 @@ AVAILABLE TOOLS:
             all_tools_dict = self.mcp_registry.get_tools()
             for mcp_name, tools in all_tools_dict.items():
                 for tool in tools:
+                        self._index_tool_name(mcp_name, tool['name'])
                         claude_tools.append({
                             "name": f"{mcp_name}__{tool['name']}",  # Prefix with MCP name
                             "description": f"[{mcp_name}] {tool['description']}",
@@ -421,13 +458,14 @@ AVAILABLE TOOLS:
                     all_tool_names = [t["name"] for t in all_tools_in_mcp]
                     
                     # Apply tool-level permissions
-                    allowed_tool_names = await self.user_service.get_user_allowed_tools(
+                    allowed_tool_names = frozenset(await self.user_service.get_user_allowed_tools(
                         user_id, mcp_name, all_tool_names
-                    )
+                    ))
                     
                     # Build Claude tools only for allowed tools
                     for tool in all_tools_in_mcp:
                         if tool["name"] in allowed_tool_names:
+                            self._index_tool_name(mcp_name, tool['name'])
                             claude_tools.append({
                                 "name": f"{mcp_name}__{tool['name']}",
                                 "description": f"[{mcp_name}] {tool['description']}",
@@ -478,6 +516,9 @@ AVAILABLE TOOLS:
         # Track all tool results across iterations
         all_tool_results = []
         
+        # Tool result block currently holding the prompt-cache breakpoint
+        cached_block = None
+        
         if self.use_prompt_caching:
             # Anthropic prompt caching: mark system prompt as cacheable
             # This saves ~90% on input tokens for iterations 2+ (cached for 5 min)
@@ -530,12 +571,12 @@ AVAILABLE TOOLS:
                 )
                 
                 # Extract token usage from response
-                if hasattr(response, 'usage'):
-                    total_input_tokens += response.usage.input_tokens
-                    total_output_tokens += response.usage.output_tokens
-                    # Cached tokens (prompt caching feature)
-                    if hasattr(response.usage, 'cache_read_input_tokens'):
-                        total_cached_tokens += response.usage.cache_read_input_tokens
+                usage = response.usage
+                if usage is not None:
+                    total_input_tokens += usage.input_tokens or 0
+                    total_output_tokens += usage.output_tokens or 0
+                    # Cached tokens (prompt caching feature, depends on the SDK version)
+                    total_cached_tokens += getattr(usage, "cache_read_input_tokens", 0) or 0
                 
                 # Check for tool use
                 tool_uses = [block for block in response.content if isinstance(block, ToolUseBlock)]
@@ -575,9 +616,10 @@ AVAILABLE TOOLS:
                 )
                 
                 tool_results = []
+                no_cache = False
                 for tool_use in tool_uses:
                     tool_full_name = tool_use.name  # e.g., "github_mcp__search_repositories"
-                    mcp_name, tool_name = tool_full_name.split("__", 1)
+                    mcp_name, tool_name, tool_label = self._resolve_tool_name(tool_full_name)
                     
                     try:
                         # Call the actual MCP tool
@@ -598,10 +640,11 @@ AVAILABLE TOOLS:
                         tool_results.append({
                             "type": "tool_result",
                             "tool_use_id": tool_use.id,
-                            "content": str(tool_result),
+                            "content": self._truncate_tool_result(str(tool_result), mcp_name, tool_name),
                         })
+                        no_cache = no_cache or self._cache_hint(tool_result) == "no-cache"
                         
-                        all_tools_used.append(f"{mcp_name}.{tool_name}")
+                        all_tools_used.append(tool_label)
                         total_tool_calls += 1
                         
                         logger.info(
@@ -624,9 +667,12 @@ AVAILABLE TOOLS:
                             "is_error": True,
                         })
                 
+                cached_block = self._cache_tool_results(tool_results, cached_block, no_cache)
+                
                 # Add assistant response and tool results to conversation
                 system_messages.append({"role": "assistant", "content": response.content})
                 system_messages.append({"role": "user", "content": tool_results})
+                system_messages = self._compact_history(system_messages)
                 
                 # Loop back to let Claude continue with tool results
                 
@@ -670,7 +716,7 @@ AVAILABLE TOOLS:
         tool_restrictions: dict = None,
     ) -> AsyncGenerator[Dict[str, Any], None]:
         """
-        Stream a chat response using Anthropic streaming API when available.
+        Stream a chat response using the async Anthropic streaming API.
         
         Args:
             user_id: User email
@@ -717,6 +763,7 @@ AVAILABLE TOOLS:
         total_tool_calls = 0
         all_tools_used = []
         iteration_count = 0
+        cached_block = None
         total_input_tokens = 0
         total_output_tokens = 0
         total_cached_tokens = 0
@@ -726,47 +773,35 @@ AVAILABLE TOOLS:
             final_message = None
 
             try:
-                if self.async_client is not None:
-                    async with self.async_client.messages.stream(
-                        model=self.model,
-                        max_tokens=self.max_tokens,
-                        system=system_config,
-                        tools=claude_tools,
-                        messages=system_messages,
-                    ) as stream:
-                        async for text in stream.text_stream:
-                            if text:
-                                yield {"type": "token", "text": text}
-                        final_message = await stream.get_final_message()
-                else:
-                    with self.client.messages.stream(
-                        model=self.model,
-                        max_tokens=self.max_tokens,
-                        system=system_config,
-                        tools=claude_tools,
-                        messages=system_messages,
-                    ) as stream:
-                        for text in stream.text_stream:
-                            if text:
-                                yield {"type": "token", "text": text}
-                        final_message = stream.get_final_message()
-
-                if hasattr(final_message, "usage"):
-                    total_input_tokens += getattr(final_message.usage, "input_tokens", 0)
-                    total_output_tokens += getattr(final_message.usage, "output_tokens", 0)
-                    total_cached_tokens += getattr(final_message.usage, "cache_read_input_tokens", 0)
-
-                tool_uses = [
-                    block for block in final_message.content
-                    if isinstance(block, ToolUseBlock)
-                ]
+                async with self.async_client.messages.stream(
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    system=system_config,
+                    tools=claude_tools,
+                    messages=system_messages,
+                ) as stream:
+                    async for text in self._batch_tokens(stream.text_stream):
+                        yield {"type": "token", "text": text}
+                    final_message = await stream.get_final_message()
+
+                usage = final_message.usage
+                if usage is not None:
+                    total_input_tokens += usage.input_tokens or 0
+                    total_output_tokens += usage.output_tokens or 0
+                    # cache_read_input_tokens depends on the SDK version
+                    total_cached_tokens += getattr(usage, "cache_read_input_tokens", 0) or 0
+
+                # Partition content blocks in a single pass
+                tool_uses = []
+                text_parts = []
+                for block in final_message.content:
+                    if isinstance(block, ToolUseBlock):
+                        tool_uses.append(block)
+                    elif isinstance(block, TextBlock):
+                        text_parts.append(block.text)
 
                 if not tool_uses:
-                    text_blocks = [
-                        block for block in final_message.content
-                        if isinstance(block, TextBlock)
-                    ]
-                    final_answer = "\n".join(block.text for block in text_blocks)
+                    final_answer = "\n".join(text_parts)
 
                     yield {
                         "type": "done",
@@ -782,43 +817,59 @@ AVAILABLE TOOLS:
                     }
                     return
 
-                tool_results = []
+                # Emit tool_call events in Claude's block order before dispatching
+                tool_calls = []
                 for tool_use in tool_uses:
-                    tool_full_name = tool_use.name
-                    mcp_name, tool_name = tool_full_name.split("__", 1)
+                    mcp_name, tool_name, tool_label = self._resolve_tool_name(tool_use.name)
+                    tool_calls.append((tool_use, mcp_name, tool_name, tool_label))
                     
                     # Emit tool_call event with parameters
                     yield {"type": "tool_call", "mcp": mcp_name, "tool": tool_name, "parameters": tool_use.input}
-                    
-                    try:
-                        tool_result = await self.mcp_registry.call_tool(
+                
+                # Independent tool calls run concurrently; results keep block order
+                call_results = await asyncio.gather(
+                    *(
+                        self.mcp_registry.call_tool(
                             mcp_name=mcp_name,
                             tool_name=tool_name,
                             arguments=tool_use.input,
                         )
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use.id,
-                            "content": str(tool_result),
-                        })
-                        all_tools_used.append(f"{mcp_name}.{tool_name}")
-                        total_tool_calls += 1
-                    except Exception as e:
+                        for tool_use, mcp_name, tool_name, _ in tool_calls
+                    ),
+                    return_exceptions=True,
+                )
+                
+                tool_results = []
+                no_cache = False
+                for (tool_use, mcp_name, tool_name, tool_label), tool_result in zip(tool_calls, call_results):
+                    if isinstance(tool_result, BaseException):
                         logger.error(
                             "Tool execution failed",
                             mcp=mcp_name,
                             tool=tool_name,
-                            error=str(e),
+                            error=str(tool_result),
                         )
                         tool_results.append({
                             "type": "tool_result",
                             "tool_use_id": tool_use.id,
-                            "content": f"Error: {str(e)}",
+                            "content": f"Error: {str(tool_result)}",
                             "is_error": True,
                         })
+                        continue
+                    
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": tool_use.id,
+                        "content": self._truncate_tool_result(str(tool_result), mcp_name, tool_name),
+                    })
+                    no_cache = no_cache or self._cache_hint(tool_result) == "no-cache"
+                    all_tools_used.append(tool_label)
+                    total_tool_calls += 1
 
+                cached_block = self._cache_tool_results(tool_results, cached_block, no_cache)
                 system_messages.append({"role": "assistant", "content": final_message.content})
                 system_messages.append({"role": "user", "content": tool_results})
+                system_messages = self._compact_history(system_messages)
 
             except Exception as e:
                 logger.error(
@@ -845,6 +896,198 @@ AVAILABLE TOOLS:
             },
         }
 
+    def _index_tool_name(self, mcp_name: str, tool_name: str):
+        """Record the parsed form of an unsanitized Claude tool name."""
+        self._tool_name_index[f"{mcp_name}__{tool_name}"] = (mcp_name, tool_name, f"{mcp_name}.{tool_name}")
+    
+    def _resolve_tool_name(self, full_name: str) -> tuple:
+        """Map a Claude tool name back to (mcp_name, tool_name, "mcp.tool")."""
+        parsed = self._tool_name_index.get(full_name)
+        if parsed is None:
+            mcp_name, tool_name = full_name.split("__", 1)
+            parsed = (mcp_name, tool_name, f"{mcp_name}.{tool_name}")
+        return parsed
+    
+    def _compact_history(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse older tool turns once history exceeds the message window or token budget.
+        
+        messages[0] is the user's question and the rest are (assistant tool_use,
+        user tool_result) pairs. The oldest pairs are dropped and summarized in
+        a text block on the first message, so tool_use/tool_result pairing and
+        role alternation stay valid. Repeated compactions fold into that same
+        block. Tokens are estimated as chars / 4.
+        """
+        estimated_tokens = sum(len(str(m["content"])) for m in messages) // 4
+        if len(messages) <= self.max_history_messages and estimated_tokens <= self.context_budget_tokens:
+            return messages
+        
+        keep = 2 * self.history_keep_turns
+        if len(messages) - 1 <= keep:
+            return messages
+        
+        dropped = messages[1:-keep]
+        turns_omitted = len(dropped) // 2
+        tools_called = [
+            block.name
+            for m in dropped if m["role"] == "assistant"
+            for block in m["content"] if isinstance(block, ToolUseBlock)
+        ]
+        
+        first = messages[0]
+        content = first["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        
+        # Carry forward the summary from an earlier compaction instead of stacking another
+        kept = []
+        earlier_tools: List[str] = []
+        for block in content:
+            match = (
+                _SUMMARY_RE.fullmatch(block.get("text", ""))
+                if isinstance(block, dict) and block.get("type") == "text"
+                else None
+            )
+            if match:
+                turns_omitted += int(match.group(1))
+                if match.group(2) != "none":
+                    earlier_tools.extend(match.group(2).split(", "))
+            else:
+                kept.append(block)
+        tools_called = earlier_tools + tools_called
+        
+        summary = {
+            "type": "text",
+            "text": (
+                f"{_SUMMARY_PREFIX}: {turns_omitted} earlier tool turn(s) omitted. "
+                f"Tools called: {', '.join(tools_called) or 'none'}."
+            ),
+        }
+        
+        logger.info(
+            "History compacted",
+            dropped_messages=len(dropped),
+            estimated_tokens=estimated_tokens,
+        )
+        return [{"role": first["role"], "content": [*kept, summary]}, *messages[-keep:]]
+    
+    @staticmethod
+    def _cache_hint(tool_result: Any) -> Optional[str]:
+        """Get the MCP-provided _meta.cache_hint for a tool result, if any."""
+        meta = tool_result.get("meta") if isinstance(tool_result, dict) else None
+        return meta.get("cache_hint") if isinstance(meta, dict) else None
+    
+    def _cache_tool_results(
+        self, tool_results: List[Dict[str, Any]], cached_block: Optional[Dict[str, Any]], no_cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Move the prompt-cache breakpoint onto the newest tool results.
+        
+        Only one breakpoint is kept on tool results (besides the system prompt)
+        to stay within Anthropic's breakpoint limit. Results flagged
+        cache_hint="no-cache" are appended after the current breakpoint
+        without extending it.
+        
+        Returns:
+            The block now holding the breakpoint
+        """
+        if not self.use_prompt_caching or no_cache or not tool_results:
+            return cached_block
+        
+        if cached_block is not None:
+            cached_block.pop("cache_control", None)
+        tool_results[-1]["cache_control"] = {"type": "ephemeral"}
+        return tool_results[-1]
+    
+    def _truncate_tool_result(self, content: str, mcp_name: str, tool_name: str) -> str:
+        """Keep the head and tail of oversized tool output before it goes back to Claude."""
+        if len(content) <= self.max_tool_result_chars:
+            return content
+        
+        dropped = len(content) - self.max_tool_result_chars
+        half = self.max_tool_result_chars // 2
+        logger.info(
+            "tool_result_truncated",
+            mcp=mcp_name,
+            tool=tool_name,
+            original_chars=len(content),
+            dropped_chars=dropped,
+        )
+        return f"{content[:half]}\n…[truncated {dropped} chars]…\n{content[-half:]}"
+    
+    async def aclose(self):
+        """Close the pooled HTTP connections to Anthropic."""
+        await self.async_client.close()
+        self.client.close()
+    
+    async def _batch_tokens(self, text_stream) -> AsyncGenerator[str, None]:
+        """
+        Coalesce streamed tokens into batches.
+        
+        Batch size grows 1, 3, 9, ... up to stream_batch_max_tokens so the first
+        token still goes out immediately. A batch is also flushed once it is
+        older than stream_batch_max_ms, even if the model has paused (e.g. while
+        a tool_use block streams, which text_stream does not yield).
+        """
+        loop = asyncio.get_running_loop()
+        max_wait = self.stream_batch_max_ms / 1000
+        batch_size = 1
+        buf: List[str] = []
+        first_ts = 0.0
+        # One reader task per stream feeds the queue; None marks the end and an
+        # exception instance is re-raised here, in the consumer
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def read_stream():
+            try:
+                async for text in text_stream:
+                    if text:
+                        queue.put_nowait(text)
+            except Exception as e:
+                queue.put_nowait(e)
+            else:
+                queue.put_nowait(None)
+        
+        reader = asyncio.create_task(read_stream())
+        try:
+            while True:
+                if buf:
+                    # Only a partially filled batch arms the flush timer
+                    try:
+                        async with asyncio.timeout_at(first_ts + max_wait):
+                            item = await queue.get()
+                    except TimeoutError:
+                        yield "".join(buf)
+                        buf = []
+                        batch_size = min(batch_size * 3, self.stream_batch_max_tokens)
+                        continue
+                else:
+                    item = await queue.get()
+                
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                
+                if not buf:
+                    first_ts = loop.time()
+                buf.append(item)
+                
+                if len(buf) >= batch_size:
+                    yield "".join(buf)
+                    buf = []
+                    batch_size = min(batch_size * 3, self.stream_batch_max_tokens)
+        except Exception:
+            # Don't lose tokens the client hasn't seen yet
+            if buf:
+                yield "".join(buf)
+            raise
+        finally:
+            reader.cancel()
+        
+        if buf:
+            yield "".join(buf)
+
 # Global LLM service instance
 _llm_service: Optional[LLMService] = None
 
@@ -860,3 +1103,11 @@ def get_llm_service() -> LLMService:
     if _llm_service is None:
         _llm_service = LLMService()
     return _llm_service
+
+
+async def close_llm_service():
+    """Close the global LLM service if it was created."""
+    global _llm_service
+    if _llm_service is not None:
+        await _llm_service.aclose()
+        _llm_service = None
@@ -13,14 +13,20 @@ Key Features:
 """
 
 import asyncio
+import heapq
+import random
 import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import Text, bindparam, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
 from app.models import MCPServer, MCPHealthLog
 from app.services.circuit_breaker import get_circuit_breaker
+from app.services.mcp_registry import get_mcp_registry
 from app.services.websocket_broadcaster import get_websocket_broadcaster
 from app.utils.logger import logger
 from app.database import AsyncSessionLocal
@@ -29,21 +35,194 @@ from app.database import AsyncSessionLocal
 logger = logger.bind(service="Coordinator")
 
 
+@dataclass(slots=True)
+class MCPEntry:
+    """In-memory state for one loaded MCP."""
+    client: Any
+    tools: List[Dict] = field(default_factory=list)
+    created_at: float = 0.0
+
+
+class ServerRow(NamedTuple):
+    """Snapshot of the mcp_servers columns the coordinator branches on."""
+    id: int
+    name: str
+    health_status: Optional[str]
+    consecutive_failures: Optional[int]
+    circuit_state: Optional[str]
+
+
+@dataclass(slots=True)
+class WriteIntent:
+    """One queued write for the DB writer task.
+    
+    ``kind`` names a statement from ``_statements()`` or is ``'health_log'``
+    (params are ``_health_log_row`` kwargs). ``result`` is set once the batch
+    holding the write has committed.
+    """
+    kind: str
+    params: Dict[str, Any]
+    result: Optional[asyncio.Future] = None
+    
+    
+@dataclass
+class ProbeResult:
+    """Outcome of a single MCP health probe."""
+    name: str
+    ok: bool
+    response_ms: int = 0
+    error: Optional[str] = None
+
+
+_statements_cache: Optional[SimpleNamespace] = None
+
+
+def _statements() -> SimpleNamespace:
+    """Coordinator SQL statements, built once and executed with bind parameters."""
+    global _statements_cache
+    if _statements_cache is not None:
+        return _statements_cache
+        
+    by_names = MCPServer.name.in_(bindparam("names", expanding=True))
+    by_name = MCPServer.name == bindparam("mcp")
+    no_sync = {"synchronize_session": False}
+    
+    _statements_cache = SimpleNamespace(
+        server_ids=select(MCPServer.id, MCPServer.name).where(by_names),
+        server_by_name=select(MCPServer).where(by_name),
+        active_servers=(
+            select(
+                MCPServer.id,
+                MCPServer.name,
+                MCPServer.health_status,
+                MCPServer.consecutive_failures,
+                MCPServer.circuit_state,
+            )
+            .where(MCPServer.status == 'active')
+        ),
+        # Digest of configuration columns only: updated_at is bumped by every
+        # health/circuit write (onupdate and the mcp_servers trigger)
+        config_generation=(
+            select(
+                func.count(MCPServer.id),
+                func.md5(func.string_agg(
+                    func.concat_ws(
+                        '|',
+                        MCPServer.id,
+                        MCPServer.name,
+                        MCPServer.url,
+                        MCPServer.protocol,
+                        MCPServer.timeout_seconds,
+                        MCPServer.auth_type,
+                        cast(MCPServer.auth_config, Text),
+                    ),
+                    aggregate_order_by(literal('\n'), MCPServer.id),
+                )),
+            )
+            .where(MCPServer.status == 'active')
+        ),
+        mark_healthy=(
+            update(MCPServer).where(by_names)
+            .values(
+                health_status='healthy',
+                last_health_check=bindparam("ts"),
+                consecutive_failures=0
+            )
+            .execution_options(**no_sync)
+        ),
+        mark_disconnected=(
+            update(MCPServer).where(by_names)
+            .values(
+                health_status='disconnected',
+                last_health_check=bindparam("ts"),
+                consecutive_failures=MCPServer.consecutive_failures + bindparam("inc")
+            )
+            .returning(MCPServer.name, MCPServer.consecutive_failures)
+            .execution_options(**no_sync)
+        ),
+        open_circuit=(
+            update(MCPServer).where(by_name)
+            .values(health_status='circuit_open', circuit_state='open')
+            .execution_options(**no_sync)
+        ),
+        set_circuit_state=(
+            update(MCPServer).where(by_name)
+            .values(circuit_state=bindparam("circuit_state"))
+            .execution_options(**no_sync)
+        ),
+        half_open=(
+            update(MCPServer).where(by_name)
+            .values(circuit_state='half_open', last_recovery_attempt=bindparam("ts"))
+            .execution_options(**no_sync)
+        ),
+        close_circuit=(
+            update(MCPServer).where(by_name)
+            .values(circuit_state='closed', consecutive_failures=0)
+            .execution_options(**no_sync)
+        ),
+        mark_recovery_attempt=(
+            update(MCPServer).where(by_name)
+            .values(last_recovery_attempt=bindparam("ts"))
+            .execution_options(**no_sync)
+        ),
+    )
+    return _statements_cache
+
+
 class MCPCoordinator:
     """Centralized MCP management coordinator."""
     
     def __init__(self):
-        self.mcps: Dict[str, any] = {}  # Active MCP connections
-        self.tools_cache: Dict[str, List[Dict]] = {}  # Cached tools
-        self.client_created_at: Dict[str, float] = {}  # Connection timestamps
+        self.state: Dict[str, MCPEntry] = {}  # Active MCP connections, tools and timestamps
+        # Read-only view handed to callers; rebuilt only when state changes
+        self._tools_snapshot: Mapping[str, List[Dict]] = MappingProxyType({})
         self.circuit_breaker = get_circuit_breaker()
+        self._broadcaster = None
+        self._registry = None
         self.running = False
         self.coordinator_task: Optional[asyncio.Task] = None
         
+        # WebSocket fan-out runs in its own task so slow clients can't stall a tick
+        self._broadcast_queue: asyncio.Queue = asyncio.Queue(maxsize=1024)
+        self._broadcast_task: Optional[asyncio.Task] = None
+        
+        # All coordinator writes go through one writer task, batched per transaction
+        self._write_queue: asyncio.Queue[WriteIntent] = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        self.write_batch_size = 64
+        
         # State tracking
         self.last_db_scan = None
-        self.recovery_queue: Set[str] = set()
+        self._last_config_generation: Optional[Tuple[int, Optional[str]]] = None
+        self.recovery_queue: Set[str] = set()  # Membership; discards leave heap tombstones
+        self._recovery_heap: List[Tuple[float, str]] = []  # (next attempt ts, name)
         self.health_check_queue: Set[str] = set()
+        self._server_ids: Dict[str, int] = {}  # MCP name -> mcp_servers.id
+        self._server_cache: Dict[str, ServerRow] = {}  # Active servers from the last scan
+        self._recovery_state: Dict[str, Tuple[int, float]] = {}  # name -> (attempts, next attempt ts)
+        self.probe_timeout = 5.0  # Seconds before a hung probe counts as failed
+        self.log_success_every_n = 10  # Health log sampling for steady-state successes
+        self._tick_count = 0
+        self.recovery_backoff_base = 30.0
+        self.recovery_backoff_cap = 300.0
+        
+        # Circuit FSM: open -> half_open (one trial) -> closed | open
+        self._circuit_reopen_at: Dict[str, Tuple[int, float]] = {}  # name -> (trials, half-open ts)
+        self.circuit_open_seconds = 60.0
+        
+    @property
+    def broadcaster(self):
+        """WebSocket broadcaster, resolved once on first use."""
+        if self._broadcaster is None:
+            self._broadcaster = get_websocket_broadcaster()
+        return self._broadcaster
+        
+    @property
+    def registry(self):
+        """MCP registry, resolved once on first use."""
+        if self._registry is None:
+            self._registry = get_mcp_registry()
+        return self._registry
         
     async def start(self):
         """Start the MCP coordinator background task."""
@@ -52,6 +231,8 @@ class MCPCoordinator:
             return
             
         self.running = True
+        self._broadcast_task = asyncio.create_task(self._drain_broadcasts())
+        self._writer_task = asyncio.create_task(self._db_writer())
         self.coordinator_task = asyncio.create_task(self._coordinator_loop())
         logger.info("🚀 MCP Coordinator started")
         
@@ -59,10 +240,24 @@ class MCPCoordinator:
         """Stop the MCP coordinator and cleanup resources."""
         self.running = False
         
-        if self.coordinator_task:
-            self.coordinator_task.cancel()
+        for task in (self.coordinator_task, self._broadcast_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                    
+        # Let queued writes land before the writer goes away
+        if self._writer_task:
             try:
-                await self.coordinator_task
+                await asyncio.wait_for(self._write_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Pending coordinator writes dropped on shutdown",
+                               pending=self._write_queue.qsize())
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
             except asyncio.CancelledError:
                 pass
                 
@@ -80,18 +275,29 @@ class MCPCoordinator:
                     await asyncio.sleep(5)
                     continue
                     
+                # One wall-clock and one monotonic timestamp for the whole tick
+                self._tick_count += 1
+                tick_time = datetime.now(timezone.utc)
+                tick_mono = time.monotonic()
+                
                 async with AsyncSessionLocal() as db:
+                    # 0. Let one trial through for circuits whose open period expired
+                    await self._probe_half_open_circuits(db, tick_time, tick_mono)
+                    
                     # 1. Health check active MCPs
-                    await self._health_check_active_mcps(db)
+                    await self._health_check_active_mcps(db, tick_time, tick_mono)
                     
                     # 2. Attempt recovery for failed MCPs
-                    await self._attempt_recovery(db)
-                    
-                    # 3. Scan database for configuration changes
-                    await self._scan_database_changes(db)
+                    await self._attempt_recovery(db, tick_time, tick_mono)
                     
-                    # 4. Update statistics
-                    await self._update_statistics(db)
+                    # 3. Scan database for configuration changes (skipped when unchanged)
+                    generation = await self._config_generation(db)
+                    if generation != self._last_config_generation:
+                        await self._scan_database_changes(db)
+                        self._last_config_generation = generation
+                        
+                # 4. Update statistics (in-memory only, no session needed)
+                await self._update_statistics()
                     
                 await asyncio.sleep(30)  # 30 second cycle
                 
@@ -99,262 +305,401 @@ class MCPCoordinator:
                 logger.error("❌ MCP Coordinator loop error", error=str(e), exc_info=True)
                 await asyncio.sleep(60)  # Longer sleep on error
                 
-    async def _health_check_active_mcps(self, db: AsyncSession):
-        """Health check all MCPs currently in memory cache."""
-        if not self.mcps:
-            return
-            
-        logger.debug("🏥 Health checking active MCPs", count=len(self.mcps))
+    async def _health_check_active_mcps(self, db: AsyncSession, tick_time: datetime, tick_mono: float):
+        """Health check all MCPs currently in memory cache.
         
-        for mcp_name in list(self.mcps.keys()):
-            try:
-                await self._health_check_single_mcp(db, mcp_name)
-            except Exception as e:
-                logger.error("❌ Health check failed", mcp=mcp_name, error=str(e))
-                await self._handle_mcp_failure(db, mcp_name, str(e))
-                
-    async def _health_check_single_mcp(self, db: AsyncSession, mcp_name: str):
-        """Perform health check on a single MCP."""
-        if mcp_name not in self.mcps:
+        Probes run concurrently; the resulting status updates and health log
+        rows are handed to the DB writer as one batch per tick.
+        """
+        if not self.state:
             return
             
-        start_time = time.time()
-        client = self.mcps[mcp_name]
+        # Open circuits are left to the half-open trial instead of being re-probed
+        names = [
+            name for name in self.state
+            if name not in self._circuit_reopen_at and not self.circuit_breaker.is_open(name)
+        ]
+        logger.debug("🏥 Health checking active MCPs",
+                     count=len(names), skipped_open=len(self.state) - len(names))
+        if not names:
+            return
         
-        try:
-            # Simple health check - list tools
-            tools_result = await client.list_tools()
-            response_time_ms = int((time.time() - start_time) * 1000)
+        results = await asyncio.gather(
+            *(self._probe(name) for name in names),
+            return_exceptions=True
+        )
+        
+        successes: List[ProbeResult] = []
+        failures: List[ProbeResult] = []
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.error("❌ Health check failed", mcp=name, error=str(result))
+                result = ProbeResult(name=name, ok=False, error=str(result))
+            (successes if result.ok else failures).append(result)
             
-            # Health check passed
-            await self._handle_mcp_success(db, mcp_name, response_time_ms)
+        if successes:
+            self._handle_mcp_successes(successes, tick_time)
+        if failures:
+            await self._handle_mcp_failures(failures, tick_time, tick_mono)
             
-        except Exception as e:
-            # Health check failed
-            await self._handle_mcp_failure(db, mcp_name, str(e))
-            
-    async def _handle_mcp_success(self, db: AsyncSession, mcp_name: str, response_time_ms: int):
-        """Handle successful MCP health check."""
-        # Update database status
-        await db.execute(
-            update(MCPServer)
-            .where(MCPServer.name == mcp_name)
-            .values(
-                health_status='healthy',
-                last_health_check=datetime.now(timezone.utc),
-                consecutive_failures=0
+    async def _probe(self, mcp_name: str) -> ProbeResult:
+        """Perform health check on a single MCP."""
+        entry = self.state.get(mcp_name)
+        if entry is None:
+            return ProbeResult(name=mcp_name, ok=False, error="MCP not loaded")
+        client = entry.client
+            
+        start_time = time.monotonic()
+        try:
+            # Simple health check - list tools, bounded so one hung MCP cannot stall the tick
+            await asyncio.wait_for(client.list_tools(), timeout=self.probe_timeout)
+        except asyncio.TimeoutError:
+            return ProbeResult(
+                name=mcp_name,
+                ok=False,
+                error=f"Health check timed out after {self.probe_timeout}s"
             )
+        except Exception as e:
+            return ProbeResult(name=mcp_name, ok=False, error=str(e))
+            
+        return ProbeResult(
+            name=mcp_name,
+            ok=True,
+            response_ms=int((time.monotonic() - start_time) * 1000)
         )
         
-        # Log success
-        await self._log_health_event(
-            db, mcp_name, 'healthy', 
-            response_time_ms=response_time_ms,
-            event_type='health_check_success'
-        )
-        
-        # Record success in circuit breaker
-        self.circuit_breaker.record_success(mcp_name)
-        
-        # Broadcast status change via WebSocket
-        broadcaster = get_websocket_broadcaster()
-        await broadcaster.broadcast_mcp_status(
-            mcp_name, 
-            'healthy', 
-            {'response_time_ms': response_time_ms}
-        )
-        
-        logger.debug("✅ MCP health check passed", mcp=mcp_name, response_time=response_time_ms)
+    def _handle_mcp_successes(self, results: List[ProbeResult], tick_time: datetime):
+        """Handle successful MCP health checks with one UPDATE and one INSERT batch."""
+        # Steady-state successes are sampled; recoveries to healthy are always logged
+        sample_tick = self._tick_count % self.log_success_every_n == 0
+        to_log = [r for r in results if sample_tick or not self._was_healthy(r.name)]
         
-    async def _handle_mcp_failure(self, db: AsyncSession, mcp_name: str, error_message: str):
-        """Handle MCP health check failure."""
-        # Get current server info
-        result = await db.execute(
-            select(MCPServer).where(MCPServer.name == mcp_name)
+        self._submit_write(
+            'mark_healthy',
+            {"names": [r.name for r in results], "ts": tick_time}
         )
-        server = result.scalar_one_or_none()
-        
-        if not server:
-            logger.warning("⚠️ MCP not found in database", mcp=mcp_name)
-            return
+        for r in results:
+            self._update_server_cache(r.name, health_status='healthy', consecutive_failures=0)
             
-        # Increment failure count
-        consecutive_failures = (server.consecutive_failures or 0) + 1
-        
-        # Update database status
-        await db.execute(
-            update(MCPServer)
-            .where(MCPServer.name == mcp_name)
-            .values(
-                health_status='disconnected',
-                last_health_check=datetime.now(timezone.utc),
-                consecutive_failures=consecutive_failures
+        for r in to_log:
+            self._log_health_event(
+                r.name, 'healthy',
+                response_time_ms=r.response_ms,
+                event_type='health_check_success'
             )
-        )
-        
-        # Remove from cache
-        await self._remove_from_cache(mcp_name)
         
-        # Record failure in circuit breaker
-        self.circuit_breaker.record_failure(mcp_name)
-        
-        # Broadcast status change via WebSocket
-        broadcaster = get_websocket_broadcaster()
-        await broadcaster.broadcast_mcp_status(
-            mcp_name, 
-            'disconnected', 
-            {'error': error_message, 'consecutive_failures': consecutive_failures}
-        )
-        
-        # Check if circuit should open
-        if consecutive_failures >= 5:
-            await self._open_circuit(db, mcp_name)
-        else:
-            # Add to recovery queue
-            self.recovery_queue.add(mcp_name)
+        for r in results:
+            # Record success in circuit breaker
+            self.circuit_breaker.record_success(r.name)
             
-        # Log failure
-        await self._log_health_event(
-            db, mcp_name, 'disconnected',
-            error_message=error_message,
-            event_type='health_check_failed',
-            metadata={'consecutive_failures': consecutive_failures}
+            # Broadcast status change via WebSocket
+            self._queue_broadcast(
+                'broadcast_mcp_status',
+                r.name,
+                'healthy',
+                {'response_time_ms': r.response_ms}
+            )
+            
+            logger.debug("✅ MCP health check passed", mcp=r.name, response_time=r.response_ms)
+            
+    async def _handle_mcp_failures(self, results: List[ProbeResult],
+                                   tick_time: datetime, tick_mono: float):
+        """Handle failed MCP health checks with one UPDATE and one INSERT batch."""
+        names = [r.name for r in results]
+        
+        # Atomic server-side increment; RETURNING hands back the new counts
+        # (and drops names that no longer exist) once the writer commits
+        counts = await self._submit_write(
+            'mark_disconnected',
+            {"names": names, "ts": tick_time, "inc": 1},
+            want_result=True
         )
+        failures_by_name = {name: count or 0 for name, count in counts}
+        for name, count in failures_by_name.items():
+            self._update_server_cache(name, health_status='disconnected', consecutive_failures=count)
+            
+        for r in results:
+            if r.name in failures_by_name:
+                self._log_health_event(
+                    r.name, 'disconnected',
+                    error_message=r.error,
+                    event_type='health_check_failed',
+                    metadata={'consecutive_failures': failures_by_name[r.name]}
+                )
         
-        logger.warning("⚠️ MCP health check failed", 
-                      mcp=mcp_name, 
-                      failures=consecutive_failures, 
-                      error=error_message)
+        for r in results:
+            if r.name not in failures_by_name:
+                logger.warning("⚠️ MCP not found in database", mcp=r.name)
+                continue
+                
+            consecutive_failures = failures_by_name[r.name]
+            
+            # Remove from cache
+            await self._remove_from_cache(r.name)
+            
+            # Record failure in circuit breaker
+            self.circuit_breaker.record_failure(r.name)
+            
+            # Broadcast status change via WebSocket
+            self._queue_broadcast(
+                'broadcast_mcp_status',
+                r.name,
+                'disconnected',
+                {'error': r.error, 'consecutive_failures': consecutive_failures}
+            )
+            
+            # Check if circuit should open
+            if consecutive_failures >= 5:
+                self._open_circuit(r.name, tick_mono)
+            else:
+                # Add to recovery queue
+                self._enqueue_recovery(r.name)
+                
+            logger.warning("⚠️ MCP health check failed",
+                          mcp=r.name,
+                          failures=consecutive_failures,
+                          error=r.error)
                       
-    async def _open_circuit(self, db: AsyncSession, mcp_name: str):
+    def _open_circuit(self, mcp_name: str, tick_mono: float):
         """Open circuit breaker for failed MCP."""
-        await db.execute(
-            update(MCPServer)
-            .where(MCPServer.name == mcp_name)
-            .values(
-                health_status='circuit_open',
-                circuit_state='open'
-            )
-        )
+        self._submit_write('open_circuit', {"mcp": mcp_name})
+        self._update_server_cache(mcp_name, health_status='circuit_open', circuit_state='open')
         
         # Remove from recovery queue, add to circuit recovery
         self.recovery_queue.discard(mcp_name)
+        self._recovery_state.pop(mcp_name, None)
+        self._schedule_half_open(mcp_name, tick_mono)
         
-        await self._log_health_event(
-            db, mcp_name, 'circuit_open',
-            event_type='circuit_opened'
-        )
+        self._log_health_event(mcp_name, 'circuit_open', event_type='circuit_opened')
         
         # Broadcast circuit breaker event via WebSocket
-        broadcaster = get_websocket_broadcaster()
-        await broadcaster.broadcast_health_event(
-            mcp_name, 
-            'circuit_opened', 
+        self._queue_broadcast(
+            'broadcast_health_event',
+            mcp_name,
+            'circuit_opened',
             {'threshold': 5}
         )
         
         logger.warning("⚡ Circuit breaker opened", mcp=mcp_name)
         
+    def _queue_broadcast(self, method: str, *args):
+        """Hand a broadcaster call to the fan-out task; drop it if the queue is full."""
+        try:
+            self._broadcast_queue.put_nowait((method, args))
+        except asyncio.QueueFull:
+            logger.warning("⚠️ Broadcast queue full, dropping event", method=method, mcp=args[0])
+            
+    async def _drain_broadcasts(self):
+        """Deliver queued broadcasts one at a time, off the coordinator loop."""
+        while self.running:
+            method, args = await self._broadcast_queue.get()
+            try:
+                await getattr(self.broadcaster, method)(*args)
+            except Exception as e:
+                logger.warning("⚠️ Broadcast failed", method=method, mcp=args[0], error=str(e))
+                
     async def _remove_from_cache(self, mcp_name: str):
         """Remove MCP from memory cache."""
-        if mcp_name in self.mcps:
+        entry = self.state.pop(mcp_name, None)
+        if entry is not None:
+            self._refresh_tools_snapshot()
             try:
-                client = self.mcps[mcp_name]
-                await client.__aexit__(None, None, None)
+                await entry.client.__aexit__(None, None, None)
             except Exception as e:
                 logger.warning("⚠️ Error closing MCP connection", mcp=mcp_name, error=str(e))
-            finally:
-                del self.mcps[mcp_name]
-                self.tools_cache.pop(mcp_name, None)
-                self.client_created_at.pop(mcp_name, None)
+            self._server_ids.pop(mcp_name, None)
                 
         logger.debug("🗑️ Removed MCP from cache", mcp=mcp_name)
         
-    async def _attempt_recovery(self, db: AsyncSession):
+    def _refresh_tools_snapshot(self):
+        """Rebuild the read-only tools view after state changes."""
+        self._tools_snapshot = MappingProxyType(
+            {name: entry.tools for name, entry in self.state.items()}
+        )
+        
+    async def _attempt_recovery(self, db: AsyncSession, tick_time: datetime, tick_mono: float):
         """Attempt recovery for MCPs in recovery queue."""
-        if not self.recovery_queue:
+        # Pop only the MCPs whose backoff deadline has passed
+        heap = self._recovery_heap
+        candidates: List[str] = []
+        while heap and heap[0][0] <= tick_mono:
+            _, name = heapq.heappop(heap)
+            if (
+                name in self.recovery_queue
+                and name not in candidates
+                # A later reschedule has its own heap entry
+                and self._recovery_state.get(name, (0, 0.0))[1] <= tick_mono
+            ):
+                candidates.append(name)
+        if not candidates:
             return
             
-        logger.debug("🔄 Attempting MCP recovery", count=len(self.recovery_queue))
+        logger.debug("🔄 Attempting MCP recovery",
+                     count=len(candidates), queued=len(self.recovery_queue))
         
-        # Process recovery queue (copy to avoid modification during iteration)
-        for mcp_name in list(self.recovery_queue):
+        for mcp_name in candidates:
             try:
-                await self._attempt_single_recovery(db, mcp_name)
+                await self._attempt_single_recovery(db, mcp_name, tick_time, tick_mono)
             except Exception as e:
                 logger.error("❌ Recovery attempt failed", mcp=mcp_name, error=str(e))
+                self._schedule_recovery_retry(mcp_name, tick_mono)
                 
-    async def _attempt_single_recovery(self, db: AsyncSession, mcp_name: str):
+    async def _attempt_single_recovery(self, db: AsyncSession, mcp_name: str,
+                                       tick_time: datetime, tick_mono: float):
         """Attempt recovery for a single MCP."""
-        # Get server info
-        result = await db.execute(
-            select(MCPServer).where(MCPServer.name == mcp_name)
-        )
+        # The scan snapshot answers "is this still worth recovering" without a query
+        cached = self._server_cache.get(mcp_name)
+        if cached and cached.health_status not in ('disconnected', 'circuit_open'):
+            self.recovery_queue.discard(mcp_name)
+            self._recovery_state.pop(mcp_name, None)
+            return
+            
+        # Get server info (load_mcp needs the full row)
+        result = await db.execute(_statements().server_by_name, {"mcp": mcp_name})
         server = result.scalar_one_or_none()
         
         if not server or server.health_status not in ['disconnected', 'circuit_open']:
             self.recovery_queue.discard(mcp_name)
+            self._recovery_state.pop(mcp_name, None)
             return
             
         # Check circuit breaker
         if self.circuit_breaker.is_open(mcp_name):
             logger.debug("⚡ Circuit breaker open, skipping recovery", mcp=mcp_name)
+            self._enqueue_recovery(mcp_name, tick_mono + self.recovery_backoff_base)
             return
             
         # Attempt to load MCP
         logger.info("🔄 Attempting MCP recovery", mcp=mcp_name)
         
         # Update recovery attempt timestamp
-        await db.execute(
-            update(MCPServer)
-            .where(MCPServer.name == mcp_name)
-            .values(last_recovery_attempt=datetime.now(timezone.utc))
-        )
+        self._submit_write('mark_recovery_attempt', {"mcp": mcp_name, "ts": tick_time})
         
         # Try to load the MCP (reuse existing load logic)
-        from app.services.mcp_registry import get_mcp_registry
-        registry = get_mcp_registry()
-        
         try:
-            await registry.load_mcp(server, db)
+            await self.registry.load_mcp(server, db)
             
             # Recovery successful
             self.recovery_queue.discard(mcp_name)
-            await self._log_health_event(
-                db, mcp_name, 'healthy',
-                event_type='recovery_success'
-            )
+            self._recovery_state.pop(mcp_name, None)
+            self._log_health_event(mcp_name, 'healthy', event_type='recovery_success')
             
             logger.info("✅ MCP recovery successful", mcp=mcp_name)
             
         except Exception as e:
-            # Recovery failed
-            await self._log_health_event(
-                db, mcp_name, 'disconnected',
+            # Recovery failed - back off exponentially with jitter
+            attempts = self._schedule_recovery_retry(mcp_name, tick_mono)
+            self._log_health_event(
+                mcp_name, 'disconnected',
                 error_message=str(e),
                 event_type='recovery_failed'
             )
             
-            logger.warning("❌ MCP recovery failed", mcp=mcp_name, error=str(e))
+            logger.warning("❌ MCP recovery failed", mcp=mcp_name, attempts=attempts, error=str(e))
             
+    def _backoff_delay(self, base: float, attempts: int) -> float:
+        """Capped exponential backoff with 0.5-1.5x jitter."""
+        delay = min(self.recovery_backoff_cap, base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.5)
+        
+    def _schedule_recovery_retry(self, mcp_name: str, now: float) -> int:
+        """Push the next recovery attempt out with capped exponential backoff and jitter."""
+        attempts = self._recovery_state.get(mcp_name, (0, 0.0))[0] + 1
+        delay = self._backoff_delay(self.recovery_backoff_base, attempts)
+        self._recovery_state[mcp_name] = (attempts, now + delay)
+        self._enqueue_recovery(mcp_name, now + delay)
+        return attempts
+        
+    def _enqueue_recovery(self, mcp_name: str, at: float = 0.0):
+        """Queue an MCP for recovery at monotonic time `at` (0 = next tick)."""
+        self.recovery_queue.add(mcp_name)
+        heapq.heappush(self._recovery_heap, (at, mcp_name))
+        
+    def _schedule_half_open(self, mcp_name: str, now: float) -> int:
+        """Schedule the next half-open trial for an open circuit."""
+        trials = self._circuit_reopen_at.get(mcp_name, (0, 0.0))[0] + 1
+        delay = self._backoff_delay(self.circuit_open_seconds, trials)
+        self._circuit_reopen_at[mcp_name] = (trials, now + delay)
+        return trials
+        
+    async def _probe_half_open_circuits(self, db: AsyncSession, tick_time: datetime, tick_mono: float):
+        """Move expired open circuits to half_open and run a single trial for each."""
+        if not self._circuit_reopen_at:
+            return
+            
+        due = [name for name, (_, at) in self._circuit_reopen_at.items() if at <= tick_mono]
+        for mcp_name in due:
+            try:
+                await self._half_open_trial(db, mcp_name, tick_time, tick_mono)
+            except Exception as e:
+                logger.error("❌ Half-open trial failed", mcp=mcp_name, error=str(e))
+                self._reopen_circuit(mcp_name, tick_mono, error=str(e))
+                
+    async def _half_open_trial(self, db: AsyncSession, mcp_name: str,
+                               tick_time: datetime, tick_mono: float):
+        """Let exactly one load attempt through; close the circuit on success, reopen on failure."""
+        result = await db.execute(_statements().server_by_name, {"mcp": mcp_name})
+        server = result.scalar_one_or_none()
+        
+        if not server or server.status != 'active':
+            self._circuit_reopen_at.pop(mcp_name, None)
+            return
+            
+        self._submit_write('half_open', {"mcp": mcp_name, "ts": tick_time})
+        logger.info("🔌 Circuit half-open, sending trial probe", mcp=mcp_name)
+        
+        await self.registry.load_mcp(server, db)
+        
+        if mcp_name in self.registry.entries:
+            # Trial passed - close the circuit
+            self._circuit_reopen_at.pop(mcp_name, None)
+            self._submit_write('close_circuit', {"mcp": mcp_name})
+            self._update_server_cache(mcp_name, circuit_state='closed', consecutive_failures=0)
+            self._log_health_event(mcp_name, 'healthy', event_type='circuit_closed')
+            self._queue_broadcast('broadcast_health_event', mcp_name, 'circuit_closed', {})
+            logger.info("✅ Circuit closed after half-open trial", mcp=mcp_name)
+        else:
+            self._reopen_circuit(mcp_name, tick_mono)
+            
+    def _reopen_circuit(self, mcp_name: str, tick_mono: float, error: Optional[str] = None):
+        """Failed or aborted trial - back to open with a longer wait."""
+        trials = self._schedule_half_open(mcp_name, tick_mono)
+        self._submit_write('set_circuit_state', {"mcp": mcp_name, "circuit_state": 'open'})
+        self._update_server_cache(mcp_name, circuit_state='open')
+        self._log_health_event(
+            mcp_name, 'circuit_open',
+            error_message=error,
+            event_type='circuit_reopened',
+            metadata={'trials': trials}
+        )
+        logger.warning("⚡ Circuit reopened after failed trial", mcp=mcp_name, trials=trials)
+            
+    async def _config_generation(self, db: AsyncSession) -> Tuple[int, Optional[str]]:
+        """Cheap change marker: (row count, config digest) of active servers."""
+        result = await db.execute(_statements().config_generation)
+        return tuple(result.one())
+        
     async def _scan_database_changes(self, db: AsyncSession):
         """Scan database for MCP configuration changes."""
         # Get all active MCPs from database
-        result = await db.execute(
-            select(MCPServer).where(MCPServer.status == 'active')
-        )
-        db_mcps = result.scalars().all()
+        result = await db.execute(_statements().active_servers)
+        db_mcps = [ServerRow(*row) for row in result.all()]
         
-        current_names = set(self.mcps.keys())
+        current_names = set(self.state)
         db_names = set(mcp.name for mcp in db_mcps)
         
+        # Refresh the per-tick server snapshot and name -> id cache
+        self._server_cache = {mcp.name: mcp for mcp in db_mcps}
+        for mcp in db_mcps:
+            self._server_ids[mcp.name] = mcp.id
+        
         # Load new MCPs
         new_mcps = db_names - current_names
         if new_mcps:
             logger.info("🆕 New MCPs detected", mcps=list(new_mcps))
             for mcp in db_mcps:
                 if mcp.name in new_mcps and mcp.health_status != 'disabled':
-                    self.recovery_queue.add(mcp.name)
+                    self._enqueue_recovery(mcp.name)
                     
         # Remove deleted MCPs
         removed_mcps = current_names - db_names
@@ -363,63 +708,150 @@ class MCPCoordinator:
             for mcp_name in removed_mcps:
                 await self._remove_from_cache(mcp_name)
                 self.recovery_queue.discard(mcp_name)
+                self._recovery_state.pop(mcp_name, None)
+                self._server_ids.pop(mcp_name, None)
                 
-    async def _update_statistics(self, db: AsyncSession):
+    def _was_healthy(self, mcp_name: str) -> bool:
+        """Whether the cached server row already says healthy."""
+        row = self._server_cache.get(mcp_name)
+        return row is not None and row.health_status == 'healthy'
+        
+    def _update_server_cache(self, mcp_name: str, **changes):
+        """Apply a write we just made to the cached server row."""
+        row = self._server_cache.get(mcp_name)
+        if row is not None:
+            self._server_cache[mcp_name] = row._replace(**changes)
+            
+    async def _update_statistics(self):
         """Update system statistics and metrics."""
         stats = {
-            'active_mcps': len(self.mcps),
+            'active_mcps': len(self.state),
             'recovery_queue': len(self.recovery_queue),
-            'circuit_open_count': len([name for name in self.mcps 
-                                     if self.circuit_breaker.is_open(name)])
+            'circuit_open_count': len(self.circuit_breaker.snapshot_open().intersection(self.state))
         }
         
         logger.debug("📊 MCP Coordinator stats", **stats)
         
-    async def _log_health_event(self, db: AsyncSession, mcp_name: str, status: str, 
-                               response_time_ms: Optional[int] = None,
-                               error_message: Optional[str] = None,
-                               event_type: str = 'health_check',
-                               metadata: Optional[Dict] = None):
-        """Log health event to database."""
+    async def _prefetch_server_ids(self, db: AsyncSession, names: Iterable[str]):
+        """Load mcp_servers.id for any names not yet in the id cache."""
+        missing = [name for name in names if name not in self._server_ids]
+        if not missing:
+            return
+            
+        result = await db.execute(_statements().server_ids, {"names": missing})
+        for server_id, name in result.all():
+            self._server_ids[name] = server_id
+            
+    def _health_log_row(self, mcp_name: str, status: str,
+                        response_time_ms: Optional[int] = None,
+                        error_message: Optional[str] = None,
+                        event_type: str = 'health_check',
+                        metadata: Optional[Dict] = None) -> Optional[MCPHealthLog]:
+        """Build a health log row from the cached server id (None if unknown)."""
+        server_id = self._server_ids.get(mcp_name)
+        if server_id is None:
+            return None
+            
+        return MCPHealthLog(
+            mcp_server_id=server_id,
+            status=status,
+            response_time_ms=response_time_ms,
+            error_message=error_message,
+            event_type=event_type,
+            meta_data=metadata
+        )
+        
+    def _log_health_event(self, mcp_name: str, status: str,
+                          response_time_ms: Optional[int] = None,
+                          error_message: Optional[str] = None,
+                          event_type: str = 'health_check',
+                          metadata: Optional[Dict] = None):
+        """Queue a health log row for the DB writer."""
+        self._submit_write('health_log', {
+            "mcp_name": mcp_name,
+            "status": status,
+            "response_time_ms": response_time_ms,
+            "error_message": error_message,
+            "event_type": event_type,
+            "metadata": metadata,
+        })
+        
+    def _submit_write(self, kind: str, params: Dict[str, Any],
+                      want_result: bool = False) -> Optional[asyncio.Future]:
+        """Queue a write for the DB writer; the future resolves to the rows it returned."""
+        future = asyncio.get_running_loop().create_future() if want_result else None
+        self._write_queue.put_nowait(WriteIntent(kind, params, future))
+        return future
+        
+    async def _db_writer(self):
+        """Single writer: drain queued writes and commit each batch in one transaction."""
+        queue = self._write_queue
+        while True:
+            intents = [await queue.get()]
+            while len(intents) < self.write_batch_size and not queue.empty():
+                intents.append(queue.get_nowait())
+                
+            try:
+                await self._flush_writes(intents)
+            except Exception as e:
+                logger.error("❌ Coordinator write batch failed", count=len(intents), error=str(e))
+            finally:
+                for _ in intents:
+                    queue.task_done()
+                    
+    async def _flush_writes(self, intents: List[WriteIntent]):
+        """Apply one batch of write intents in FIFO order and commit once."""
+        statements = _statements()
+        results: List[Tuple[WriteIntent, Any]] = []
         try:
-            # Get server ID
-            result = await db.execute(
-                select(MCPServer.id).where(MCPServer.name == mcp_name)
-            )
-            server_id = result.scalar_one_or_none()
-            
-            if server_id:
-                log_entry = MCPHealthLog(
-                    mcp_server_id=server_id,
-                    status=status,
-                    response_time_ms=response_time_ms,
-                    error_message=error_message,
-                    event_type=event_type,
-                    metadata=metadata
+            async with AsyncSessionLocal() as db:
+                await self._prefetch_server_ids(
+                    db, {i.params["mcp_name"] for i in intents if i.kind == 'health_log'}
                 )
-                db.add(log_entry)
+                
+                log_rows = []
+                for intent in intents:
+                    if intent.kind == 'health_log':
+                        row = self._health_log_row(**intent.params)
+                        if row is not None:
+                            log_rows.append(row)
+                        continue
+                        
+                    result = await db.execute(getattr(statements, intent.kind), intent.params)
+                    if intent.result is not None:
+                        results.append((intent, result.all()))
+                        
+                db.add_all(log_rows)
                 await db.commit()
                 
         except Exception as e:
-            logger.warning("⚠️ Failed to log health event", mcp=mcp_name, error=str(e))
+            for intent in intents:
+                if intent.result is not None and not intent.result.done():
+                    intent.result.set_exception(e)
+            raise
             
+        # Callers only see RETURNING rows once they are committed
+        for intent, rows in results:
+            if not intent.result.done():
+                intent.result.set_result(rows)
+                
     async def _cleanup_all_connections(self):
         """Cleanup all MCP connections on shutdown."""
-        for mcp_name in list(self.mcps.keys()):
+        for mcp_name in list(self.state):
             await self._remove_from_cache(mcp_name)
             
     # Public interface methods
     def get_loaded_mcps(self) -> List[str]:
         """Get list of currently loaded MCP names."""
-        return list(self.mcps.keys())
+        return list(self.state)
         
-    def get_tools_cache(self) -> Dict[str, List[Dict]]:
-        """Get current tools cache."""
-        return self.tools_cache.copy()
+    def get_tools_cache(self) -> Mapping[str, List[Dict]]:
+        """Get current tools cache (read-only snapshot)."""
+        return self._tools_snapshot
         
     def is_mcp_healthy(self, mcp_name: str) -> bool:
         """Check if MCP is currently healthy and loaded."""
-        return mcp_name in self.mcps
+        return mcp_name in self.state
 
 
 # Global coordinator instance
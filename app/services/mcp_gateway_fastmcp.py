@@ -8,31 +8,42 @@ similar to WS Chat - tools are filtered per-user at request time.
 """
 
 import logging
+from contextvars import ContextVar, Token
 from fastmcp import FastMCP
 from fastmcp.exceptions import ToolError
-from typing import Any
+from typing import Any, Optional
 
 from app.services.mcp_registry import get_mcp_registry
-from app.services.mcp_permission_service import get_mcp_permission_service
+from app.services.mcp_permission_service import can_call_tool, compile_restrictions
 
 logger = logging.getLogger(__name__)
 
 # Create FastMCP instance with stateless HTTP
 mcp = FastMCP("omni2-mcp-gateway-v2", stateless_http=True)
 
-# Store user context in request state (set by middleware)
-_current_user_context = None
+# User context for the current request (set by middleware). A ContextVar keeps
+# it per-task, so concurrent requests never see each other's context.
+_user_ctx: ContextVar[Optional[dict]] = ContextVar("user_ctx", default=None)
 
 
-def set_user_context(context: dict):
-    """Set user context for current request"""
-    global _current_user_context
-    _current_user_context = context
+def set_user_context(context: dict) -> Token:
+    """Set user context for current request; pass the token to reset_user_context
+
+    tool_restrictions are compiled here, once per request, instead of on every
+    tool call.
+    """
+    compiled = compile_restrictions(context.get('tool_restrictions'))
+    return _user_ctx.set({**context, 'tool_restrictions': compiled})
+
+
+def reset_user_context(token: Token):
+    """Restore the user context that was active before set_user_context"""
+    _user_ctx.reset(token)
 
 
-def get_user_context() -> dict:
+def get_user_context() -> Optional[dict]:
     """Get user context for current request"""
-    return _current_user_context
+    return _user_ctx.get()
 
 
 @mcp.tool()
@@ -52,17 +63,16 @@ async def dynamic_tool_proxy(tool_name: str, **kwargs) -> Any:
     mcp_name, actual_tool_name = tool_name.split("__", 1)
     
     # Check permission
-    permission_service = get_mcp_permission_service()
-    if not permission_service.can_call_tool(
+    if not can_call_tool(
+        user_context.get('tool_restrictions', {}),
         mcp_name,
-        actual_tool_name,
-        user_context.get('tool_restrictions', {})
+        actual_tool_name
     ):
         raise ToolError(f"Permission denied for tool: {tool_name}")
     
     # Execute tool via registry (same as WS Chat)
     registry = get_mcp_registry()
-    client = registry.mcps.get(mcp_name)
+    client = registry.get_client(mcp_name)
     if not client:
         raise ToolError(f"MCP server not available: {mcp_name}")
     
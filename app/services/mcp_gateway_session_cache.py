@@ -9,16 +9,30 @@ HTTP Streamable maintains sessions, so we can cache:
 - Filtered tools list
 
 This avoids repeated DB queries for the same user session.
+
+Sessions are keyed by a short SHA-256 digest of the token, so raw tokens are
+never held as keys or sent over Redis. Invalidations are published on the
+`mcp_session_invalidate` channel so every worker drops the same entries.
 """
 
-from typing import Dict, Optional
+from typing import List, Optional, Set, Tuple
 import time
 import asyncio
+import hashlib
+import heapq
 import json
+from collections import OrderedDict
 from dataclasses import dataclass
 from redis.asyncio import Redis
 from app.utils.logger import logger
 
+INVALIDATE_CHANNEL = "mcp_session_invalidate"
+
+
+def token_key(token: str) -> str:
+    """Cache key for a token (truncated SHA-256, safe to publish)"""
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
 
 @dataclass
 class SessionCache:
@@ -30,86 +44,140 @@ class SessionCache:
     created_at: float
     last_accessed: float
     flow_session_id: str = None  # Stable ID for grouping all tool calls from this token
+    allowed: frozenset = frozenset()  # Prefixed tool names (mcp__tool) from filtered_tools
 
 
 class MCPGatewaySessionCache:
     """Session cache for MCP Gateway"""
     
-    def __init__(self, ttl_seconds: int = 300):  # 5 minutes default
-        self.cache: Dict[str, SessionCache] = {}
+    def __init__(self, ttl_seconds: int = 300, max_entries: int = 10_000):  # 5 minutes default
+        # token_key -> session, LRU order: least recently used first
+        self.cache: "OrderedDict[str, SessionCache]" = OrderedDict()
         self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # (expires_at, token_key) min-heap; stale entries are skipped on pop
+        self._expiry_heap: List[Tuple[float, str]] = []
         self.redis: Optional[Redis] = None
         self.listener_task = None
         self._shutdown = False
+        # Strong refs: the loop only holds tasks weakly, so unreferenced publishes could be GC'd
+        self._publish_tasks: Set[asyncio.Task] = set()
     
     def get(self, token: str) -> Optional[SessionCache]:
         """Get cached session data"""
-        if token not in self.cache:
+        key = token_key(token)
+        session = self.cache.get(key)
+        if session is None:
             return None
         
-        session = self.cache[token]
-        
         # Check if expired
         if time.time() - session.created_at > self.ttl_seconds:
-            del self.cache[token]
+            del self.cache[key]
             return None
         
         # Update last accessed
         session.last_accessed = time.time()
+        self.cache.move_to_end(key)
         return session
     
     def set(self, token: str, user_id: int, user_context: dict, 
             available_mcps: list, filtered_tools: list):
         """Cache session data"""
         from uuid import uuid4
-        self.cache[token] = SessionCache(
+        now = time.time()
+        key = token_key(token)
+        self.cache[key] = SessionCache(
             user_id=user_id,
             user_context=user_context,
             available_mcps=available_mcps,
             filtered_tools=filtered_tools,
-            created_at=time.time(),
-            last_accessed=time.time(),
-            flow_session_id=str(uuid4())
+            created_at=now,
+            last_accessed=now,
+            flow_session_id=str(uuid4()),
+            allowed=frozenset(tool["name"] for tool in filtered_tools)
         )
+        self.cache.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (now + self.ttl_seconds, key))
+        
+        # Evict least recently used sessions beyond the cap
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
     
     def invalidate(self, token: str):
-        """Invalidate cached session"""
-        if token in self.cache:
-            del self.cache[token]
+        """Invalidate cached session in this worker and its siblings"""
+        key = token_key(token)
+        self.cache.pop(key, None)
+        self._publish_invalidation({"token_hash": key})
     
     def cleanup_expired(self):
-        """Remove expired sessions"""
+        """Remove expired sessions (pops only the expired heads of the heap)"""
         now = time.time()
-        expired = [
-            token for token, session in self.cache.items()
-            if now - session.created_at > self.ttl_seconds
-        ]
-        for token in expired:
-            del self.cache[token]
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, key = heapq.heappop(heap)
+            session = self.cache.get(key)
+            # Skip tombstones left by invalidation or a later re-set
+            if session is not None and now - session.created_at >= self.ttl_seconds:
+                del self.cache[key]
     
     def get_stats(self) -> dict:
         """Get cache statistics"""
         return {
             "total_sessions": len(self.cache),
+            "max_entries": self.max_entries,
             "ttl_seconds": self.ttl_seconds
         }
     
-    def invalidate_user(self, user_id: int):
-        """Invalidate all sessions for a user"""
-        tokens_to_remove = [
-            token for token, session in self.cache.items()
+    def invalidate_user(self, user_id: int, broadcast: bool = True):
+        """Invalidate all sessions for a user (and in sibling workers if broadcast)"""
+        keys_to_remove = [
+            key for key, session in self.cache.items()
             if session.user_id == user_id
         ]
-        for token in tokens_to_remove:
-            del self.cache[token]
-        if tokens_to_remove:
-            logger.info(f"[MCP-CACHE] Invalidated {len(tokens_to_remove)} sessions for user {user_id}")
+        for key in keys_to_remove:
+            del self.cache[key]
+        if keys_to_remove:
+            logger.info(f"[MCP-CACHE] Invalidated {len(keys_to_remove)} sessions for user {user_id}")
+        if broadcast:
+            self._publish_invalidation({"user_id": user_id})
+    
+    def _publish_invalidation(self, payload: dict):
+        """Fire-and-forget publish so sibling workers drop the same entries"""
+        if not self.redis:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(
+                self.redis.publish(INVALIDATE_CHANNEL, json.dumps(payload))
+            )
+        except RuntimeError:
+            # No running loop (sync caller) - local invalidation already done
+            return
+        self._publish_tasks.add(task)
+        task.add_done_callback(self._publish_done)
+    
+    def _publish_done(self, task: asyncio.Task):
+        """Release a finished publish and report failures (other workers keep stale sessions)"""
+        self._publish_tasks.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            logger.error(f"[MCP-CACHE] Failed to publish session invalidation: {error}")
+    
+    def _apply_invalidation(self, data: dict):
+        """Apply an invalidation received from another worker (never re-published)"""
+        token_hash = data.get("token_hash")
+        if token_hash:
+            self.cache.pop(token_hash, None)
+        user_id = data.get("user_id")
+        if user_id is not None:
+            self.invalidate_user(user_id, broadcast=False)
     
     async def start_listener(self, redis: Redis):
-        """Start Redis listener for user_blocked events"""
+        """Start Redis listener for user_blocked and invalidation events"""
         self.redis = redis
         self.listener_task = asyncio.create_task(self._listen_for_block_events())
-        logger.info("[MCP-CACHE] Started Redis listener for user_blocked events")
+        logger.info(f"[MCP-CACHE] Started Redis listener for user_blocked and {INVALIDATE_CHANNEL} events")
     
     async def stop_listener(self):
         """Stop Redis listener"""
@@ -123,10 +191,10 @@ class MCPGatewaySessionCache:
             logger.info("[MCP-CACHE] Stopped Redis listener")
     
     async def _listen_for_block_events(self):
-        """Listen for user_blocked events and invalidate cache"""
+        """Listen for user_blocked and invalidation events and invalidate cache"""
         pubsub = self.redis.pubsub()
-        await pubsub.subscribe("user_blocked")
-        logger.info("[MCP-CACHE] Listening for user_blocked events")
+        await pubsub.subscribe("user_blocked", INVALIDATE_CHANNEL)
+        logger.info(f"[MCP-CACHE] Listening for user_blocked and {INVALIDATE_CHANNEL} events")
         
         try:
             async for message in pubsub.listen():
@@ -136,13 +204,18 @@ class MCPGatewaySessionCache:
                 if message["type"] == "message":
                     try:
                         data = json.loads(message["data"])
+                        if message["channel"] == INVALIDATE_CHANNEL:
+                            self._apply_invalidation(data)
+                            continue
+                        
                         user_id = data.get("user_id")
                         blocked_services = data.get("blocked_services", [])
                         
                         # Only invalidate if 'mcp' is in blocked_services
                         if "mcp" in blocked_services:
                             logger.warning(f"[MCP-CACHE] Block event for user {user_id} (mcp blocked)")
-                            self.invalidate_user(user_id)
+                            # Every worker receives user_blocked itself - no need to re-publish
+                            self.invalidate_user(user_id, broadcast=False)
                         else:
                             logger.info(f"[MCP-CACHE] Block event for user {user_id} (mcp not blocked, ignoring)")
                     except:
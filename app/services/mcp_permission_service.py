@@ -5,13 +5,227 @@ Centralized service for filtering MCP servers, tools, resources, and prompts
 based on user permissions. Used by both WebSocket chat and MCP gateway.
 """
 
+import asyncio
+import json
+import sys
+import time
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Any, Dict, Iterable, NamedTuple
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from fastapi import Depends
 from app.database import get_db
 
 
+# Active MCP catalog shared by all requests in this process; admin writes
+# invalidate it, other workers pick changes up within the TTL
+MCP_CATALOG_TTL_SECONDS = 30.0
+_MCP_CACHE = {'ts': 0.0, 'rows': None, 'pending': None, 'generation': 0}
+
+_CATALOG_QUERY = text("""
+    SELECT name, url, description
+    FROM omni2.mcp_servers
+    WHERE status = 'active'
+    ORDER BY name
+""")
+
+
+def invalidate_mcp_catalog():
+    """Drop the cached MCP catalog so the next lookup re-reads mcp_servers.
+    
+    Bumping the generation keeps a query already in flight from storing its
+    pre-invalidation snapshot; new lookups stop sharing that query too.
+    """
+    _MCP_CACHE['rows'] = None
+    _MCP_CACHE['pending'] = None
+    _MCP_CACHE['generation'] += 1
+
+
+@lru_cache(maxsize=256)
+def _parse_restrictions(raw: str) -> dict:
+    """Decode a tool_restrictions JSON string once per distinct value.
+    
+    auth_service.roles.tool_restrictions is JSONB and the asyncpg driver
+    decodes it to a dict, so this only sees legacy text values. The returned
+    dict is shared between callers and must not be mutated. Invalid JSON
+    decodes to {} (no restrictions), as before.
+    """
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+# Compiled form of ['*']; checks compare by identity
+_WILDCARD = object()
+
+
+class _Allowed(NamedTuple):
+    """Compiled allow-lists for one MCP: _WILDCARD or a frozenset of names."""
+    tools: Any
+    resources: Any
+    prompts: Any
+
+
+# Shared entry for MCPs without restrictions
+_UNRESTRICTED = _Allowed(tools=_WILDCARD, resources=_WILDCARD, prompts=_WILDCARD)
+
+
+def _allowed_set(allowed):
+    """['*'] / missing -> _WILDCARD, [] / None -> empty set, otherwise the names as a frozenset."""
+    if allowed is _WILDCARD or allowed == ['*']:
+        return _WILDCARD
+    # Interned to share storage with the registry's (interned) tool names
+    return frozenset(sys.intern(name) if type(name) is str else name for name in allowed or ())
+
+
+def _compile_entry(restriction) -> _Allowed:
+    """Compile one MCP's restriction (simple list or extended dict format)."""
+    if isinstance(restriction, dict):
+        return _Allowed(
+            tools=_allowed_set(restriction.get('tools', _WILDCARD)),
+            resources=_allowed_set(restriction.get('resources', _WILDCARD)),
+            prompts=_allowed_set(restriction.get('prompts', _WILDCARD)),
+        )
+    # Simple format only restricts tools
+    return _Allowed(tools=_allowed_set(restriction), resources=_WILDCARD, prompts=_WILDCARD)
+
+
+class CompiledRestrictions(dict):
+    """tool_restrictions compiled once at auth time: MCP name -> allow-lists."""
+
+
+@lru_cache(maxsize=256)
+def _compiled_from_json(raw: str) -> CompiledRestrictions:
+    """Per-MCP allow-lists for a tool_restrictions JSON string, built once per value."""
+    return _compile_all(_parse_restrictions(raw))
+
+
+def _compile_all(restrictions: dict) -> CompiledRestrictions:
+    """Compile every MCP entry of a decoded tool_restrictions dict."""
+    return CompiledRestrictions(
+        (mcp, _compile_entry(restriction)) for mcp, restriction in restrictions.items()
+    )
+
+
+def compile_restrictions(tool_restrictions) -> CompiledRestrictions:
+    """Compile a role's tool_restrictions (None, JSON string or dict) for the checks below.
+    
+    Call once when the user context is loaded and pass the result to
+    filter_tools/filter_resources/filter_prompts/can_call_tool.
+    """
+    if isinstance(tool_restrictions, CompiledRestrictions):
+        return tool_restrictions
+    if isinstance(tool_restrictions, str):
+        return _compiled_from_json(tool_restrictions)
+    return _compile_all(tool_restrictions or {})
+
+
+def _allowed(tool_restrictions, mcp_name: str) -> _Allowed:
+    """Compiled allow-lists for mcp_name (_UNRESTRICTED when it has none)."""
+    if isinstance(tool_restrictions, CompiledRestrictions):
+        return tool_restrictions.get(mcp_name, _UNRESTRICTED)
+    if isinstance(tool_restrictions, dict):
+        if mcp_name not in tool_restrictions:
+            return _UNRESTRICTED
+        return _compile_entry(tool_restrictions[mcp_name])
+    # None or legacy JSON text
+    return compile_restrictions(tool_restrictions).get(mcp_name, _UNRESTRICTED)
+
+
+def _filter(tool_restrictions, mcp_name: str, items: list, kind: int, key: itemgetter) -> list:
+    """Filter MCP items (tools, resources or prompts) based on role's tool_restrictions.
+    
+    Args:
+        tool_restrictions: Result of compile_restrictions (None, a JSON
+            string or the raw dict from the role are also accepted)
+            Simple format: {"MCP": ["*"]} or {"MCP": ["tool1"]}
+            Extended format: {"MCP": {"tools": ["*"], "resources": [...], "prompts": [...]}}
+        mcp_name: Name of the MCP
+        items: All tools/resources/prompts from the MCP
+        kind: Index into _Allowed (0 tools, 1 resources, 2 prompts)
+        key: Getter for the item field the allow-list is matched on
+    
+    Returns:
+        Filtered list of items the user can access
+    """
+    return _select(_allowed(tool_restrictions, mcp_name)[kind], items, key)
+
+
+def _select(allowed, items: list, key: itemgetter) -> list:
+    """Keep the items whose key is in a compiled allow-list."""
+    if allowed is _WILDCARD:
+        return items
+    
+    names = list(map(key, items))
+    
+    # Empty set means nothing; a list naming every item keeps the input as-is
+    if len(allowed) >= len(items) and allowed.issuperset(names):
+        return items
+    return [item for item, name in zip(items, names) if name in allowed]
+
+
+_get_name = itemgetter('name')
+_get_uri = itemgetter('uri')
+
+# Only the extended format restricts resources and prompts
+filter_tools = partial(_filter, kind=0, key=_get_name)
+filter_resources = partial(_filter, kind=1, key=_get_uri)
+filter_prompts = partial(_filter, kind=2, key=_get_name)
+
+
+def can_call_tool(tool_restrictions, mcp_name: str, tool_name: str) -> bool:
+    """Check if user can call specific tool"""
+    names = _allowed(tool_restrictions, mcp_name).tools
+    return names is _WILDCARD or tool_name in names
+
+
+def can_call_tools(tool_restrictions, mcp_name: str, tool_names: Iterable[str]) -> Dict[str, bool]:
+    """Check several tools of one MCP with a single restriction lookup"""
+    names = _allowed(tool_restrictions, mcp_name).tools
+    if names is _WILDCARD:
+        return dict.fromkeys(tool_names, True)
+    return {tool_name: tool_name in names for tool_name in tool_names}
+
+
+class RestrictionChecker:
+    """A user's compiled restrictions bound once, for repeated checks within a request.
+    
+    Same semantics as the module-level functions, minus resolving the
+    restrictions argument on every call.
+    """
+    
+    __slots__ = ('_compiled',)
+    
+    def __init__(self, compiled: CompiledRestrictions):
+        self._compiled = compiled
+        
+    def filter_tools(self, mcp_name: str, all_tools: list) -> list:
+        return _select(self._compiled.get(mcp_name, _UNRESTRICTED).tools, all_tools, _get_name)
+    
+    def filter_resources(self, mcp_name: str, all_resources: list) -> list:
+        compiled = self._compiled.get(mcp_name, _UNRESTRICTED)
+        return _select(compiled.resources, all_resources, _get_uri)
+    
+    def filter_prompts(self, mcp_name: str, all_prompts: list) -> list:
+        return _select(self._compiled.get(mcp_name, _UNRESTRICTED).prompts, all_prompts, _get_name)
+    
+    def can_call_tool(self, mcp_name: str, tool_name: str) -> bool:
+        names = self._compiled.get(mcp_name, _UNRESTRICTED).tools
+        return names is _WILDCARD or tool_name in names
+
+
+def build_checker(tool_restrictions) -> RestrictionChecker:
+    """Compile tool_restrictions and bind them into a RestrictionChecker."""
+    return RestrictionChecker(compile_restrictions(tool_restrictions))
+
+
 class MCPPermissionService:
+    """DB-bound lookups; the restriction checks are the module-level functions above."""
+    
     def __init__(self, db: AsyncSession):
         self.db = db
     
@@ -20,161 +234,54 @@ class MCPPermissionService:
         if not mcp_access:
             return []
         
-        # Handle wildcard - return all active MCPs
-        if '*' in mcp_access:
-            query = text("""
-                SELECT name, url, description
-                FROM omni2.mcp_servers
-                WHERE status = 'active'
-            """)
-            result = await self.db.execute(query)
-        else:
-            query = text("""
-                SELECT name, url, description
-                FROM omni2.mcp_servers
-                WHERE name = ANY(:mcp_access)
-                AND status = 'active'
-            """)
-            result = await self.db.execute(query, {"mcp_access": mcp_access})
-        
-        rows = result.fetchall()
+        rows = await self._active_catalog()
         
-        return [
-            {
-                "name": row.name,
-                "url": row.url,
-                "description": row.description
-            }
-            for row in rows
-        ]
-    
-    def filter_tools(self, mcp_name: str, all_tools: list, tool_restrictions) -> list:
-        """Filter tools based on role's tool_restrictions.
+        # Wildcard - return all active MCPs
+        if '*' in mcp_access:
+            return list(rows)
         
-        Args:
-            mcp_name: Name of the MCP
-            all_tools: List of all tools from MCP
-            tool_restrictions: Dict from role (can be None, string, or dict)
-                Simple format: {"MCP": ["*"]} or {"MCP": ["tool1"]}
-                Extended format: {"MCP": {"tools": ["*"], "resources": [...], "prompts": [...]}}
+        wanted = set(mcp_access)
+        return [row for row in rows if row["name"] in wanted]
+    
+    async def _active_catalog(self) -> list:
+        """Read-only name/url/description mappings of every active MCP.
         
-        Returns:
-            Filtered list of tools user can access
+        Cached for MCP_CATALOG_TTL_SECONDS; concurrent misses share one
+        in-flight query instead of each issuing their own.
         """
-        # Handle string (JSON from DB)
-        if isinstance(tool_restrictions, str):
-            import json
-            try:
-                tool_restrictions = json.loads(tool_restrictions)
-            except:
-                return all_tools
-        
-        # If no restrictions, allow all tools
-        if not tool_restrictions or mcp_name not in tool_restrictions:
-            return all_tools
-        
-        restriction = tool_restrictions[mcp_name]
-        
-        # Handle extended format {"tools": [...], "resources": [...], "prompts": [...]}
-        if isinstance(restriction, dict):
-            allowed = restriction.get('tools', ['*'])
-        # Handle simple format ["tool1", "tool2"] or ["*"] or []
-        else:
-            allowed = restriction
-        
-        # ['*'] means all tools
-        if allowed == ['*']:
-            return all_tools
-        
-        # [] means no tools
-        if not allowed:
-            return []
-        
-        # Filter to specific tools
-        return [t for t in all_tools if t['name'] in allowed]
-    
-    def filter_resources(self, mcp_name: str, all_resources: list, tool_restrictions) -> list:
-        """Filter resources based on role's tool_restrictions (extended format)"""
-        # Handle string (JSON from DB)
-        if isinstance(tool_restrictions, str):
-            import json
-            try:
-                tool_restrictions = json.loads(tool_restrictions)
-            except:
-                return all_resources
-        
-        if not tool_restrictions or mcp_name not in tool_restrictions:
-            return all_resources
-        
-        restriction = tool_restrictions[mcp_name]
-        
-        # Only extended format has resources
-        if not isinstance(restriction, dict):
-            return all_resources
-        
-        allowed = restriction.get('resources', ['*'])
-        
-        if allowed == ['*']:
-            return all_resources
-        
-        if not allowed:
-            return []
-        
-        return [r for r in all_resources if r['uri'] in allowed]
-    
-    def filter_prompts(self, mcp_name: str, all_prompts: list, tool_restrictions) -> list:
-        """Filter prompts based on role's tool_restrictions (extended format)"""
-        # Handle string (JSON from DB)
-        if isinstance(tool_restrictions, str):
-            import json
-            try:
-                tool_restrictions = json.loads(tool_restrictions)
-            except:
-                return all_prompts
-        
-        if not tool_restrictions or mcp_name not in tool_restrictions:
-            return all_prompts
-        
-        restriction = tool_restrictions[mcp_name]
-        
-        # Only extended format has prompts
-        if not isinstance(restriction, dict):
-            return all_prompts
-        
-        allowed = restriction.get('prompts', ['*'])
-        
-        if allowed == ['*']:
-            return all_prompts
-        
-        if not allowed:
-            return []
-        
-        return [p for p in all_prompts if p['name'] in allowed]
-    
-    def can_call_tool(self, mcp_name: str, tool_name: str, tool_restrictions) -> bool:
-        """Check if user can call specific tool"""
-        # Handle string (JSON from DB)
-        if isinstance(tool_restrictions, str):
-            import json
-            try:
-                tool_restrictions = json.loads(tool_restrictions)
-            except:
-                return True
-        
-        if not tool_restrictions or mcp_name not in tool_restrictions:
-            return True
-        
-        restriction = tool_restrictions[mcp_name]
-        
-        if isinstance(restriction, dict):
-            allowed = restriction.get('tools', ['*'])
-        else:
-            allowed = restriction
+        now = time.monotonic()
+        rows = _MCP_CACHE['rows']
+        if rows is not None and now - _MCP_CACHE['ts'] < MCP_CATALOG_TTL_SECONDS:
+            return rows
         
-        if allowed == ['*']:
-            return True
+        pending = _MCP_CACHE['pending']
+        if pending is not None:
+            rows = await asyncio.shield(pending)
+            if rows is not None:
+                return rows
+            # The leading request was cancelled; fetch on our own session
         
-        return tool_name in allowed
+        generation = _MCP_CACHE['generation']
+        future = asyncio.get_running_loop().create_future()
+        _MCP_CACHE['pending'] = future
+        try:
+            result = await self.db.execute(_CATALOG_QUERY)
+            rows = result.mappings().all()
+            if _MCP_CACHE['generation'] == generation:
+                _MCP_CACHE['rows'] = rows
+                _MCP_CACHE['ts'] = now
+            future.set_result(rows)
+            return rows
+        except asyncio.CancelledError:
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Waiters re-raise it; don't log it as unretrieved
+            raise
+        finally:
+            if _MCP_CACHE['pending'] is future:
+                _MCP_CACHE['pending'] = None
 
 
 async def get_mcp_permission_service(db: AsyncSession = Depends(get_db)) -> MCPPermissionService:
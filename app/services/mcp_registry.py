@@ -10,15 +10,31 @@ Features:
 - Health checking and logging
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 import asyncio
+from dataclasses import dataclass
+import hashlib
+import heapq
+import json
+import logging
+import random
+import re
+import sys
 import time
+from functools import lru_cache
+from operator import attrgetter
 import httpx
+import orjson
 from fastmcp import Client
-from sqlalchemy import select, delete
+from fastmcp.client.transports import StreamableHttpTransport
+from pydantic import BaseModel
+from sqlalchemy import select, delete, insert, text, update
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models import MCPServer, MCPTool, MCPHealthLog
 from app.utils.logger import logger
 from app.services.circuit_breaker import get_circuit_breaker
@@ -38,17 +54,139 @@ class BearerAuth(httpx.Auth):
         yield request
 
 
+_tool_fields = attrgetter('name', 'description', 'inputSchema')
+
+_CONNECTION_ERROR_TYPES = (
+    ConnectionError,
+    ConnectionRefusedError,
+    ConnectionResetError,
+    TimeoutError,
+    OSError,
+)
+
+# Error messages that mean the MCP was unreachable rather than that the call was bad
+_CONNECTION_ERROR_RE = re.compile(
+    "|".join(re.escape(keyword) for keyword in (
+        "connection refused", "connection reset", "connection closed",
+        "connect timeout", "timed out", "network unreachable",
+        "host unreachable", "no route to host", "broken pipe",
+        "all connection attempts failed", "client is not connected",
+    )),
+    re.IGNORECASE,
+)
+
+
+@lru_cache(maxsize=256)
+def _normalize_mcp_url(url: str) -> str:
+    """Streamable HTTP endpoint for a configured MCP URL (ensures a trailing /mcp)."""
+    url = url.rstrip('/')
+    return url if url.endswith('/mcp') else f"{url}/mcp"
+
+
+def _connection_fingerprint(url, protocol, timeout_seconds, auth_type, auth_config) -> bytes:
+    """Digest of the settings a live connection depends on; other columns don't need a reconnect."""
+    return hashlib.blake2b(
+        orjson.dumps(
+            [url, protocol, timeout_seconds, auth_type, auth_config],
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            default=str,
+        ),
+        digest_size=16,
+    ).digest()
+
+
+# Plain multi-row insert, used when there is no unique constraint to upsert against
+_INSERT_TOOL = insert(MCPTool)
+
+_ACTIVE_NAMES_SQL = text("SELECT name FROM omni2.mcp_servers WHERE status = 'active'")
+
+_ROWS_SELECT = (
+    "SELECT id, name, url, protocol, timeout_seconds, auth_type, auth_config, "
+    "status, updated_at FROM omni2.mcp_servers WHERE status = 'active'"
+)
+_ACTIVE_ROWS_SQL = text(_ROWS_SELECT + " AND name = ANY(:names)")
+_ACTIVE_ROWS_CHANGED_SQL = text(_ROWS_SELECT + " AND (name = ANY(:names) OR updated_at > :since)")
+
+
+class SharedPoolTransport(httpx.AsyncBaseTransport):
+    """Connection pool shared by every MCP client.
+    
+    Each fastmcp session closes its own httpx client on exit; that must not
+    tear down the pool, so only close_pool() closes the real transport.
+    """
+    def __init__(self, limits: httpx.Limits):
+        self._transport = httpx.AsyncHTTPTransport(limits=limits)
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+    
+    async def aclose(self):
+        pass
+    
+    async def close_pool(self):
+        await self._transport.aclose()
+
+
+@dataclass(slots=True)
+class LoadedMCP:
+    """Connection and cached catalogs for one loaded MCP."""
+    client: Client
+    server_id: int  # mcp_servers.id, so health logging needs no lookup by name
+    tools: List[Dict]
+    prompts: List[Dict]
+    resources: List[Dict]
+    connected_at: float  # unix timestamp of load
+    tools_fetched_at: float  # monotonic time of last tools/list
+    # Read-only tools may share one in-flight call between identical requests
+    shareable_tools: frozenset
+    fingerprint: bytes  # _connection_fingerprint of the row it was loaded from
+
+
 class MCPRegistry:
     """Database-driven MCP registry with hot reload."""
     
     def __init__(self):
-        self.mcps: Dict[str, Client] = {}
-        self.tools_cache: Dict[str, List[Dict]] = {}
-        self.prompts_cache: Dict[str, List[Dict]] = {}
-        self.resources_cache: Dict[str, List[Dict]] = {}
-        self.connected_at: Dict[str, float] = {}  # mcp_name -> unix timestamp of load
+        self.entries: Dict[str, LoadedMCP] = {}
+        self.tools_cache_ttl = float(settings.mcps.global_settings.get('tools_cache_ttl_seconds', 300))
+        self._tools_locks: Dict[str, asyncio.Lock] = {}
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Task] = {}
+        # Health log rows are written by a background task in multi-row batches
+        self._health_log_queue: asyncio.Queue = asyncio.Queue(maxsize=10_000)
+        self._health_writer_task: Optional[asyncio.Task] = None
+        self.health_log_batch_size = 500
+        self.health_log_flush_interval = 0.5  # seconds to let a batch accumulate
+        self._auth_cache: Dict[str, tuple] = {}  # mcp_name -> (token, httpx.Auth)
+        # Connection recycling: (monotonic expiry, name); entries not matching
+        # _expires_at are stale leftovers from an earlier load
+        retry_settings = settings.mcps.global_settings.get('retry') or {}
+        self.connection_max_age = float(retry_settings.get('connection_max_age_seconds', 600))
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._expires_at: Dict[str, float] = {}
+        # Upper bound on one backoff sleep between load attempts
+        self.retry_max_delay = float(retry_settings.get('max_delay_seconds', 30))
+        # Startup connects this many MCPs at once, each in its own session
+        self._load_semaphore = asyncio.Semaphore(int(settings.mcps.global_settings.get('load_concurrency', 8)))
         self.last_check: Optional[datetime] = None
         self.circuit_breaker = get_circuit_breaker()
+        # Keep-alive connections reused across reloads, health checks and tool calls
+        self._http_pool = SharedPoolTransport(
+            httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0)
+        )
+    
+    def _httpx_client_factory(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None,
+    ) -> httpx.AsyncClient:
+        """httpx client for one MCP session, backed by the shared connection pool."""
+        return httpx.AsyncClient(
+            transport=self._http_pool,
+            headers=headers,
+            timeout=timeout or httpx.Timeout(30.0),
+            auth=auth,
+            follow_redirects=True,
+        )
     
     async def load_from_database(self, db: AsyncSession):
         """Load all active MCPs from database."""
@@ -61,12 +199,40 @@ class MCPRegistry:
         )
         mcps = result.scalars().all()
         
+        open_set = self.circuit_breaker.snapshot_open()
+        if open_set:
+            logger.warning("⚡ Circuit breaker open, skipping load", servers=sorted(open_set))
+            mcps = [mcp for mcp in mcps if mcp.name not in open_set]
+        
         logger.info(f"📦 Loading {len(mcps)} active MCPs from database")
-        for mcp in mcps:
-            logger.debug(f"  - {mcp.name}: {mcp.url} ({mcp.protocol})")
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for mcp in mcps:
+                logger.debug("  - MCP", server=mcp.name, url=mcp.url, protocol=mcp.protocol)
+        
+        results = await asyncio.gather(
+            *(self._load_mcp_isolated(mcp) for mcp in mcps),
+            return_exceptions=True,
+        )
+        for mcp, result in zip(mcps, results):
+            if isinstance(result, Exception):
+                logger.error("❌ MCP load crashed", server=mcp.name, error=str(result))
+    
+    async def _load_mcp_isolated(self, mcp: MCPServer):
+        """Run load_mcp in a session of its own so loads can proceed concurrently."""
+        from app import database
         
-        for mcp in mcps:
-            await self.load_mcp(mcp, db)
+        async with self._load_semaphore:
+            async with database.AsyncSessionLocal() as db:
+                await self.load_mcp(await db.merge(mcp, load=False), db)
+    
+    async def _reconnect(self, name: str, mcp_data: Dict[str, Any]):
+        """Drop an MCP's connection and load it again, in a session of its own."""
+        from app import database
+        
+        async with self._load_semaphore:
+            async with database.AsyncSessionLocal() as db:
+                await self.unload_mcp(name, db)
+                await self.load_mcp(MCPServer(**mcp_data), db)
     
     async def load_mcp(self, mcp: MCPServer, db: AsyncSession):
         """Connect to MCP with retry logic and cache tools."""
@@ -79,40 +245,35 @@ class MCPRegistry:
         retry_delay = float(mcp.retry_delay_seconds or 1.0)
         start_time = time.time()
         
+        # Auth, URL and protocol don't change between attempts - build them once
+        auth = self._get_auth(mcp)
+        
+        url = _normalize_mcp_url(mcp.url)
+        
+        protocol = (mcp.protocol or 'http').lower()
+        
         for attempt in range(1, max_retries + 1):
             try:
-                logger.debug(f"🔌 Attempt {attempt}/{max_retries}: Connecting to {mcp.name}")
-                logger.debug(f"  URL: {mcp.url}")
-                logger.debug(f"  Protocol: {mcp.protocol}")
-                logger.debug(f"  Auth: {mcp.auth_type}")
-                logger.debug(f"  Timeout: {mcp.timeout_seconds}s")
-                
-                # Build authentication
-                auth = None
-                if mcp.auth_type and mcp.auth_config:
-                    logger.debug(f"  🔐 Setting up {mcp.auth_type} authentication")
-                    if mcp.auth_type == 'bearer':
-                        token = mcp.auth_config.get('token') or mcp.auth_config.get('api_key')
-                        if token:
-                            auth = BearerAuth(token)
-                            logger.debug(f"  ✅ Bearer token configured (length: {len(token)})")
-                        else:
-                            logger.warning(f"  ⚠️ Bearer auth configured but no token found")
-                
-                # Normalize URL
-                url = mcp.url.rstrip('/')
-                if not url.endswith('/mcp'):
-                    url = f"{url}/mcp"
-                    logger.debug(f"  🔗 Normalized URL: {url}")
+                logger.debug(
+                    "🔌 Connecting to MCP",
+                    server=mcp.name,
+                    attempt=attempt,
+                    max_retries=max_retries,
+                    url=url,
+                    protocol=protocol,
+                    auth=mcp.auth_type,
+                    timeout_seconds=mcp.timeout_seconds,
+                )
                 
                 # Create client based on protocol
-                protocol = (mcp.protocol or 'http').lower()
                 logger.debug(f"  🌐 Creating {protocol} client...")
                 
                 if protocol in ('http', 'http-streamable', 'http_streamable', 'sse'):
                     # For SSE/streamable protocols, we need to use the fastmcp Client properly
                     client = Client(
-                        transport=url,
+                        transport=StreamableHttpTransport(
+                            url, httpx_client_factory=self._httpx_client_factory
+                        ),
                         auth=auth,
                         timeout=mcp.timeout_seconds or 30
                     )
@@ -132,35 +293,15 @@ class MCPRegistry:
                 tools_list = tools_result.tools if hasattr(tools_result, 'tools') else tools_result
                 
                 # Convert to dict format
-                tools = [
-                    {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "inputSchema": tool.inputSchema.model_dump() if hasattr(tool.inputSchema, 'model_dump') else tool.inputSchema
-                    }
-                    for tool in tools_list
-                ]
+                tools = self._serialize_tools(tools_list)
+                shareable = self._shareable_names(tools_list)
                 
                 # Fetch prompts
                 prompts = []
                 try:
                     prompts_result = await client.list_prompts()
                     prompts_list = prompts_result.prompts if hasattr(prompts_result, 'prompts') else prompts_result
-                    prompts = [
-                        {
-                            "name": prompt.name,
-                            "description": prompt.description if hasattr(prompt, 'description') else "",
-                            "arguments": [
-                                {
-                                    "name": arg.name,
-                                    "description": arg.description if hasattr(arg, 'description') and arg.description else "",
-                                    "required": arg.required if hasattr(arg, 'required') else False
-                                }
-                                for arg in prompt.arguments
-                            ] if hasattr(prompt, 'arguments') and prompt.arguments else []
-                        }
-                        for prompt in prompts_list
-                    ]
+                    prompts = self._serialize_prompts(prompts_list)
                     logger.debug(f"Prompts fetched", server=mcp.name, count=len(prompts))
                 except Exception as e:
                     logger.debug(f"No prompts available", server=mcp.name, error=str(e))
@@ -170,26 +311,31 @@ class MCPRegistry:
                 try:
                     resources_result = await client.list_resources()
                     resources_list = resources_result.resources if hasattr(resources_result, 'resources') else resources_result
-                    resources = [
-                        {
-                            "uri": resource.uri,
-                            "name": resource.name if hasattr(resource, 'name') else "",
-                            "description": resource.description if hasattr(resource, 'description') else "",
-                            "mimeType": resource.mimeType if hasattr(resource, 'mimeType') else "text/plain"
-                        }
-                        for resource in resources_list
-                    ]
+                    resources = self._serialize_resources(resources_list)
                     logger.debug("Resources fetched", server=mcp.name, count=len(resources))
                 except Exception as e:
                     logger.debug("No resources available", server=mcp.name, error=str(e))
                 
                 logger.debug("Cached in registry", server=mcp.name, tools=len(tools), prompts=len(prompts), resources=len(resources))
-                self.mcps[mcp.name] = client
-                self.tools_cache[mcp.name] = tools
-                self.prompts_cache[mcp.name] = prompts
-                self.resources_cache[mcp.name] = resources
-                self.connected_at[mcp.name] = time.time()
-                logger.debug("Cache updated", cached_mcps=list(self.mcps.keys()))
+                self.entries[mcp.name] = LoadedMCP(
+                    client=client,
+                    server_id=mcp.id,
+                    tools=tools,
+                    prompts=prompts,
+                    resources=resources,
+                    connected_at=time.time(),
+                    tools_fetched_at=time.monotonic(),
+                    shareable_tools=shareable,
+                    fingerprint=_connection_fingerprint(
+                        mcp.url, mcp.protocol, mcp.timeout_seconds, mcp.auth_type, mcp.auth_config
+                    ),
+                )
+                if self.connection_max_age > 0:
+                    expires_at = time.monotonic() + self.connection_max_age
+                    self._expires_at[mcp.name] = expires_at
+                    heapq.heappush(self._expiry_heap, (expires_at, mcp.name))
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache updated", cached_mcps=list(self.entries))
                 
                 # Calculate response time
                 response_time_ms = int((time.time() - start_time) * 1000)
@@ -226,8 +372,8 @@ class MCPRegistry:
                 logger.debug(f"  ✅ Tools saved to database")
                 
                 # Log success
-                await self._log_health(
-                    db, mcp.id, 'healthy', 
+                self._log_health(
+                    mcp.id, 'healthy', 
                     response_time_ms=response_time_ms,
                     event_type='load', 
                     metadata={'tool_count': len(tools), 'attempt': attempt}
@@ -317,17 +463,16 @@ class MCPRegistry:
                         await db.commit()
                     
                     # Remove from cache if it was loaded
-                    if mcp.name in self.mcps:
+                    stale = self.entries.pop(mcp.name, None)
+                    if stale is not None:
                         try:
-                            await self.mcps[mcp.name].__aexit__(None, None, None)
+                            await stale.client.__aexit__(None, None, None)
                         except:
                             pass
-                        del self.mcps[mcp.name]
-                        self.tools_cache.pop(mcp.name, None)
                     
                     # Log error
-                    await self._log_health(
-                        db, mcp.id, 'unhealthy', 
+                    self._log_health(
+                        mcp.id, 'unhealthy', 
                         error_message=error_msg, 
                         event_type='load_failed',
                         metadata={'attempts': attempt, 'circuit_state': self.circuit_breaker.get_state(mcp.name)}
@@ -340,93 +485,156 @@ class MCPRegistry:
                     )
                     return
                 
-                # Wait before retry
-                await asyncio.sleep(retry_delay)
+                # Exponential backoff with jitter so MCPs that fail together don't retry in lockstep
+                backoff = min(retry_delay * (2 ** (attempt - 1)), self.retry_max_delay)
+                await asyncio.sleep(backoff * (0.5 + random.random()))
+    
+    def _get_auth(self, mcp: MCPServer) -> Optional[httpx.Auth]:
+        """Get httpx auth for an MCP, rebuilding it only when the token changes."""
+        token = None
+        if mcp.auth_type and mcp.auth_config:
+            logger.debug(f"  🔐 Setting up {mcp.auth_type} authentication")
+            if mcp.auth_type == 'bearer':
+                token = mcp.auth_config.get('token') or mcp.auth_config.get('api_key')
+                if not token:
+                    logger.warning(f"  ⚠️ Bearer auth configured but no token found")
+        
+        cached = self._auth_cache.get(mcp.name)
+        if cached and cached[0] == token:
+            return cached[1]
+        
+        auth = BearerAuth(token) if token else None
+        if auth:
+            logger.debug(f"  ✅ Bearer token configured (length: {len(token)})")
+        self._auth_cache[mcp.name] = (token, auth)
+        return auth
     
     async def unload_mcp(self, mcp_name: str, db: AsyncSession):
         """Disconnect and remove MCP from registry."""
-        if mcp_name in self.mcps:
+        entry = self.entries.get(mcp_name)
+        if entry is not None:
             try:
-                client = self.mcps[mcp_name]
-                await client.__aexit__(None, None, None)
+                await entry.client.__aexit__(None, None, None)
                 logger.info(f"🔌 Disconnected MCP", server=mcp_name)
             except Exception as e:
                 logger.warning(f"⚠️ Error disconnecting MCP", server=mcp_name, error=str(e))
             finally:
-                del self.mcps[mcp_name]
-                self.tools_cache.pop(mcp_name, None)
-                self.prompts_cache.pop(mcp_name, None)
-                self.resources_cache.pop(mcp_name, None)
-                self.connected_at.pop(mcp_name, None)
+                self.entries.pop(mcp_name, None)
+                self._auth_cache.pop(mcp_name, None)
+                self._expires_at.pop(mcp_name, None)
     
     async def reload_if_changed(self, db: AsyncSession):
         """Check database for changes and hot reload."""
-        from sqlalchemy import text
+        # Use raw SQL to avoid greenlet issues in background tasks.
+        # Membership comes from a names-only query; full rows are read only
+        # for MCPs that are new, changed since the last check, or due for recycling.
+        result = await db.execute(_ACTIVE_NAMES_SQL)
+        db_names = {row[0] for row in result}
         
-        # Use raw SQL to avoid greenlet issues in background tasks
-        result = await db.execute(text(
-            "SELECT id, name, url, protocol, timeout_seconds, auth_type, auth_config, "
-            "status, updated_at FROM omni2.mcp_servers WHERE status = 'active'"
-        ))
-        rows = result.fetchall()
+        # Set algebra straight on the keys view; no copy of the loaded names
+        loaded = self.entries.keys()
+        # New MCPs with an open circuit would only be skipped by load_mcp
+        new_mcps = db_names - loaded - self.circuit_breaker.snapshot_open()
+        removed_mcps = loaded - db_names
+        expired = [name for name in self._pop_expired() if name in db_names]
+        
+        wanted = new_mcps.union(expired)
+        if self.last_check:
+            result = await db.execute(
+                _ACTIVE_ROWS_CHANGED_SQL,
+                {"names": list(wanted), "since": self.last_check}
+            )
+        elif wanted:
+            result = await db.execute(_ACTIVE_ROWS_SQL, {"names": list(wanted)})
+        else:
+            result = None
         
         # Convert to dict for easier handling
-        db_mcps_data = [
-            {
+        db_mcps_data = {
+            row[1]: {
                 'id': row[0], 'name': row[1], 'url': row[2], 'protocol': row[3],
                 'timeout_seconds': row[4], 'auth_type': row[5], 'auth_config': row[6],
                 'status': row[7], 'updated_at': row[8]
             }
-            for row in rows
-        ]
-        
-        current_names = set(self.mcps.keys())
-        db_names = set(mcp['name'] for mcp in db_mcps_data)
+            for row in (result.fetchall() if result is not None else ())
+        }
         
         # Load new MCPs
-        new_mcps = db_names - current_names
-        for mcp_data in db_mcps_data:
-            if mcp_data['name'] in new_mcps:
-                logger.info(f"🆕 New MCP detected", server=mcp_data['name'])
-                
-                # Broadcast new MCP event BEFORE loading
-                broadcaster = get_websocket_broadcaster()
-                await broadcaster.broadcast_event(
-                    event_type="mcp_status_change",
-                    event_data={
-                        "mcp_name": mcp_data['name'],
-                        "old_status": "not_loaded",
-                        "new_status": "loading",
-                        "reason": "New MCP server detected in database",
-                        "severity": "info",
-                        "url": mcp_data['url'],
-                        "protocol": mcp_data['protocol']
-                    }
-                )
-                
-                # Create MCPServer object from dict and load
-                from app.models import MCPServer
-                mcp = MCPServer(**mcp_data)
-                await self.load_mcp(mcp, db)
+        for name in new_mcps:
+            mcp_data = db_mcps_data.get(name)
+            if mcp_data is None:
+                continue
+            logger.info(f"🆕 New MCP detected", server=name)
+            
+            # Broadcast new MCP event BEFORE loading
+            broadcaster = get_websocket_broadcaster()
+            await broadcaster.broadcast_event(
+                event_type="mcp_status_change",
+                event_data={
+                    "mcp_name": name,
+                    "old_status": "not_loaded",
+                    "new_status": "loading",
+                    "reason": "New MCP server detected in database",
+                    "severity": "info",
+                    "url": mcp_data['url'],
+                    "protocol": mcp_data['protocol']
+                }
+            )
+            
+            # Create MCPServer object from dict and load
+            await self.load_mcp(MCPServer(**mcp_data), db)
         
         # Unload removed MCPs
-        removed_mcps = current_names - db_names
         for name in removed_mcps:
             logger.info("🗑️ MCP removed", server=name)
             await self.unload_mcp(name, db)
         
-        # Reload changed MCPs (check updated_at)
+        # Reconnect changed MCPs (updated_at filtered in SQL) and connections
+        # older than connection_max_age in one concurrent pass
+        reconnect = {}
         if self.last_check:
-            for mcp_data in db_mcps_data:
-                if mcp_data['updated_at'] > self.last_check and mcp_data['name'] in current_names:
-                    logger.info(f"🔄 MCP config changed", server=mcp_data['name'])
-                    await self.unload_mcp(mcp_data['name'], db)
-                    from app.models import MCPServer
-                    mcp = MCPServer(**mcp_data)
-                    await self.load_mcp(mcp, db)
+            for name, mcp_data in db_mcps_data.items():
+                if mcp_data['updated_at'] > self.last_check and name in self.entries and name not in new_mcps:
+                    entry = self.entries.get(name)
+                    fingerprint = _connection_fingerprint(
+                        mcp_data['url'], mcp_data['protocol'], mcp_data['timeout_seconds'],
+                        mcp_data['auth_type'], mcp_data['auth_config'],
+                    )
+                    if entry is not None and entry.fingerprint == fingerprint:
+                        logger.debug("MCP row updated, connection settings unchanged", server=name)
+                        continue
+                    logger.info(f"🔄 MCP config changed", server=name)
+                    reconnect[name] = mcp_data
+        for name in expired:
+            mcp_data = db_mcps_data.get(name)
+            if name in reconnect or name not in self.entries or mcp_data is None:
+                continue
+            logger.debug("♻️ Recycling MCP connection", server=name, max_age_seconds=self.connection_max_age)
+            reconnect[name] = mcp_data
+        
+        if reconnect:
+            results = await asyncio.gather(
+                *(self._reconnect(name, mcp_data) for name, mcp_data in reconnect.items()),
+                return_exceptions=True,
+            )
+            for name, result in zip(reconnect, results):
+                if isinstance(result, Exception):
+                    logger.error("❌ MCP reconnect crashed", server=name, error=str(result))
         
         self.last_check = datetime.now(timezone.utc)
     
+    def _pop_expired(self) -> List[str]:
+        """Pop the MCPs whose connection age limit has passed."""
+        heap = self._expiry_heap
+        now = time.monotonic()
+        expired = []
+        while heap and heap[0][0] <= now:
+            expires_at, name = heapq.heappop(heap)
+            # Reloaded or unloaded since this entry was pushed
+            if self._expires_at.get(name) == expires_at and name in self.entries:
+                expired.append(name)
+        return expired
+    
     async def call_tool(self, mcp_name: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Execute tool on MCP."""
         # Check circuit breaker first
@@ -439,25 +647,49 @@ class MCPRegistry:
                 "retry_after_seconds": retry_after
             }
         
-        if mcp_name not in self.mcps:
+        entry = self.entries.get(mcp_name)
+        if entry is None:
             return {
                 "status": "error",
                 "error": f"MCP '{mcp_name}' not loaded"
             }
         
+        if tool_name not in entry.shareable_tools:
+            return await self._call_tool(mcp_name, tool_name, arguments)
+        
+        # Identical concurrent calls to a read-only tool ride on one MCP round-trip
+        digest = hashlib.blake2b(
+            json.dumps(arguments, sort_keys=True, default=str).encode(), digest_size=16
+        ).hexdigest()
+        key = (mcp_name, tool_name, digest)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._call_tool(mcp_name, tool_name, arguments))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller giving up doesn't cancel the call for the others
+        return dict(await asyncio.shield(task))
+    
+    async def _call_tool(self, mcp_name: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Forward one tool call to the MCP and record the outcome in the circuit breaker."""
         try:
-            client = self.mcps[mcp_name]
+            client = self.entries[mcp_name].client
             result = await client.call_tool(tool_name, arguments)
             
             # Record success
             self.circuit_breaker.record_success(mcp_name)
             
-            return {
+            response = {
                 "status": "success",
                 "result": result.content if hasattr(result, 'content') else result,
                 "server": mcp_name,
                 "tool": tool_name
             }
+            # Pass through MCP _meta (e.g. cache_hint) when the server sent one
+            meta = getattr(result, 'meta', None)
+            if meta:
+                response["meta"] = meta
+            return response
         except Exception as e:
             # Record failure
             self.circuit_breaker.record_failure(mcp_name)
@@ -471,23 +703,26 @@ class MCPRegistry:
                 "circuit_state": self.circuit_breaker.get_state(mcp_name)
             }
     
-    async def health_check(self, mcp_name: str, db: AsyncSession) -> Dict[str, Any]:
-        """Check health of MCP by attempting to list tools."""
-        if mcp_name not in self.mcps:
-            # Try to get server info from database
-            result = await db.execute(
-                select(MCPServer).where(MCPServer.name == mcp_name)
-            )
-            mcp = result.scalar_one_or_none()
+    async def health_check(
+        self, mcp_name: str, db: AsyncSession, allow_cached: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Check health of MCP with a ping, falling back to listing tools.
+        
+        Args:
+            mcp_name: MCP to check
+            db: Database session
+            allow_cached: Report healthy without a network call if tools/list
+                succeeded within the tools cache TTL
+        """
+        entry = self.entries.get(mcp_name)
+        if entry is None:
+            # Update health status to reflect disconnected state
+            server_id = await self._mark_unhealthy(db, MCPServer.name == mcp_name)
             
-            if mcp:
-                # Update health status to reflect disconnected state
-                mcp.health_status = 'unhealthy'
-                mcp.last_health_check = datetime.now(timezone.utc)
-                await db.commit()
-                
-                await self._log_health(
-                    db, mcp.id, 'unhealthy',
+            if server_id is not None:
+                self._log_health(
+                    server_id, 'unhealthy',
                     error_message=f"MCP '{mcp_name}' not loaded/connected",
                     event_type='health_check'
                 )
@@ -498,28 +733,37 @@ class MCPRegistry:
                 "circuit_state": self.circuit_breaker.get_state(mcp_name)
             }
         
+        # A fresh tools/list result already proves the MCP is alive
+        if allow_cached and self._tools_fresh(entry):
+            return {
+                "healthy": True,
+                "cached": True,
+                "tool_count": len(entry.tools),
+                "last_check": datetime.now(timezone.utc).isoformat()
+            }
+        
         try:
             start_time = time.time()
-            client = self.mcps[mcp_name]
-            tools_result = await client.list_tools()
+            client = entry.client
+            
+            # Cheap MCP ping first; only do a full tools/list when it fails
+            try:
+                alive = await client.ping()
+            except Exception as e:
+                logger.debug("Ping failed, falling back to tools/list", server=mcp_name, error=str(e))
+                alive = False
+            if not alive:
+                await self._fetch_tools(mcp_name, force_refresh=True)
             response_time_ms = int((time.time() - start_time) * 1000)
             
-            tool_count = len(tools_result.tools) if hasattr(tools_result, 'tools') else 0
+            tool_count = len(entry.tools)
             
-            # Get MCP from database
-            result = await db.execute(
-                select(MCPServer).where(MCPServer.name == mcp_name)
+            self._log_health(
+                entry.server_id, 'healthy',
+                response_time_ms=response_time_ms,
+                event_type='health_check',
+                metadata={'tool_count': tool_count}
             )
-            mcp = result.scalar_one_or_none()
-            
-            if mcp:
-                # Log health check
-                await self._log_health(
-                    db, mcp.id, 'healthy',
-                    response_time_ms=response_time_ms,
-                    event_type='health_check',
-                    metadata={'tool_count': tool_count}
-                )
             
             return {
                 "healthy": True,
@@ -532,18 +776,11 @@ class MCPRegistry:
             logger.error(f"❌ Health check failed", server=mcp_name, error=str(e))
             
             # Update database health status
-            result = await db.execute(
-                select(MCPServer).where(MCPServer.name == mcp_name)
-            )
-            mcp = result.scalar_one_or_none()
+            server_id = await self._mark_unhealthy(db, MCPServer.id == entry.server_id)
             
-            if mcp:
-                mcp.health_status = 'unhealthy'
-                mcp.last_health_check = datetime.now(timezone.utc)
-                await db.commit()
-                
-                await self._log_health(
-                    db, mcp.id, 'unhealthy',
+            if server_id is not None:
+                self._log_health(
+                    server_id, 'unhealthy',
                     error_message=str(e),
                     event_type='health_check_failed'
                 )
@@ -555,68 +792,233 @@ class MCPRegistry:
                 "circuit_state": self.circuit_breaker.get_state(mcp_name)
             }
     
+    async def _mark_unhealthy(self, db: AsyncSession, where) -> Optional[int]:
+        """Flag matching mcp_servers row unhealthy in one UPDATE ... RETURNING id."""
+        try:
+            result = await db.execute(
+                update(MCPServer)
+                .where(where)
+                .values(health_status='unhealthy', last_health_check=datetime.now(timezone.utc))
+                .returning(MCPServer.id)
+            )
+            server_id = result.scalar_one_or_none()
+            await db.commit()
+            return server_id
+        except Exception as e:
+            logger.warning("Failed to update MCP health status", error=str(e))
+            await db.rollback()
+            return None
+    
+    async def list_tools(
+        self,
+        mcp_name: Optional[str] = None,
+        force_refresh: bool = False,
+        cache_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        List tools, re-fetching tools/list only for MCPs whose catalog is older than the TTL.
+        
+        Args:
+            mcp_name: Optional MCP to list, or all loaded MCPs if not provided
+            force_refresh: Bypass the TTL and always fetch from the MCP
+            cache_only: Never touch the network; MCPs without a cached catalog
+                are reported as a cache miss
+        """
+        names = [mcp_name] if mcp_name else list(self.entries.keys())
+        
+        if cache_only and not force_refresh:
+            cached: Dict[str, Any] = {}
+            for name in names:
+                entry = self.entries.get(name)
+                cached[name] = entry.tools if entry is not None else {"tools": [], "status": "cache_miss"}
+            return cached
+
+        # Fetch all MCPs concurrently so latency is bounded by the slowest one
+        results = await asyncio.gather(
+            *(self._fetch_tools(name, force_refresh=force_refresh) for name in names),
+            return_exceptions=True
+        )
+
+        all_tools: Dict[str, Any] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning("⚠️ Failed to list tools", server=name, error=str(result))
+                all_tools[name] = {"error": str(result), "status": "unhealthy"}
+            else:
+                all_tools[name] = result
+        return all_tools
+    
+    async def _fetch_tools(self, mcp_name: str, force_refresh: bool = False) -> List[Dict]:
+        """Return one MCP's tools, serializing concurrent cache misses behind a per-MCP lock."""
+        entry = self.entries.get(mcp_name)
+        if entry is not None and not force_refresh and self._tools_fresh(entry):
+            return entry.tools
+        
+        requested_at = time.monotonic()
+        lock = self._tools_locks.setdefault(mcp_name, asyncio.Lock())
+        async with lock:
+            entry = self.entries.get(mcp_name)
+            if entry is None:
+                raise ValueError(f"MCP '{mcp_name}' not loaded")
+            # Another caller refreshed while we were waiting for the lock
+            if entry.tools_fetched_at >= requested_at:
+                return entry.tools
+            if not force_refresh and self._tools_fresh(entry):
+                return entry.tools
+            
+            tools_result = await entry.client.list_tools()
+            tools_list = tools_result.tools if hasattr(tools_result, 'tools') else tools_result
+            tools = self._serialize_tools(tools_list)
+            
+            entry.tools = tools
+            entry.shareable_tools = self._shareable_names(tools_list)
+            entry.tools_fetched_at = time.monotonic()
+            logger.debug("Tools refreshed", server=mcp_name, tools=len(tools))
+            return tools
+    
+    def _tools_fresh(self, entry: LoadedMCP) -> bool:
+        """Check if the cached tools for an MCP are within the TTL."""
+        return time.monotonic() - entry.tools_fetched_at < self.tools_cache_ttl
+    
+    def invalidate_tools(self, mcp_name: Optional[str] = None):
+        """Mark cached tools as stale so the next list_tools() re-fetches them."""
+        if mcp_name:
+            stale = [self.entries[mcp_name]] if mcp_name in self.entries else []
+        else:
+            stale = self.entries.values()
+        for entry in stale:
+            entry.tools_fetched_at = float('-inf')
+    
+    @staticmethod
+    def _shareable_names(tools_list) -> frozenset:
+        """Names of tools the MCP annotates as read-only."""
+        return frozenset(
+            tool.name for tool in tools_list
+            if getattr(getattr(tool, 'annotations', None), 'readOnlyHint', False)
+        )
+    
+    @staticmethod
+    def _serialize_tools(tools_list) -> List[Dict]:
+        """Convert MCP tool objects to dict format."""
+        tools = []
+        for tool in tools_list:
+            name, description, schema = _tool_fields(tool)
+            tools.append({
+                # Interned so permission allow-list lookups hit the identity fast path
+                "name": sys.intern(name),
+                "description": description,
+                # JSON mode so the JSONB write and API responses need no further conversion
+                "inputSchema": schema.model_dump(mode='json') if isinstance(schema, BaseModel) else schema
+            })
+        return tools
+    
+    @staticmethod
+    def _serialize_prompts(prompts_list) -> List[Dict]:
+        """Convert MCP prompt objects to dict format."""
+        prompts = []
+        for prompt in prompts_list:
+            arguments = getattr(prompt, 'arguments', None) or ()
+            prompts.append({
+                "name": prompt.name,
+                "description": getattr(prompt, 'description', ""),
+                "arguments": [
+                    {
+                        "name": arg.name,
+                        "description": getattr(arg, 'description', None) or "",
+                        "required": getattr(arg, 'required', False)
+                    }
+                    for arg in arguments
+                ]
+            })
+        return prompts
+    
+    @staticmethod
+    def _serialize_resources(resources_list) -> List[Dict]:
+        """Convert MCP resource objects to dict format."""
+        return [
+            {
+                "uri": resource.uri,
+                "name": getattr(resource, 'name', ""),
+                "description": getattr(resource, 'description', ""),
+                "mimeType": getattr(resource, 'mimeType', "text/plain")
+            }
+            for resource in resources_list
+        ]
+    
     def get_tools(self, mcp_name: Optional[str] = None) -> Dict[str, List[Dict]]:
         """Get cached tools."""
         if mcp_name:
-            return {mcp_name: self.tools_cache.get(mcp_name, [])}
-        return self.tools_cache
+            entry = self.entries.get(mcp_name)
+            return {mcp_name: entry.tools if entry is not None else []}
+        return {name: entry.tools for name, entry in self.entries.items()}
     
     def get_prompts(self, mcp_name: Optional[str] = None) -> Dict[str, List[Dict]]:
         """Get cached prompts."""
         if mcp_name:
-            return {mcp_name: self.prompts_cache.get(mcp_name, [])}
-        return self.prompts_cache
+            entry = self.entries.get(mcp_name)
+            return {mcp_name: entry.prompts if entry is not None else []}
+        return {name: entry.prompts for name, entry in self.entries.items()}
     
     def get_resources(self, mcp_name: Optional[str] = None) -> Dict[str, List[Dict]]:
         """Get cached resources."""
         if mcp_name:
-            return {mcp_name: self.resources_cache.get(mcp_name, [])}
-        return self.resources_cache
+            entry = self.entries.get(mcp_name)
+            return {mcp_name: entry.resources if entry is not None else []}
+        return {name: entry.resources for name, entry in self.entries.items()}
     
     def get_loaded_mcps(self) -> List[str]:
         """Get list of loaded MCP names."""
-        return list(self.mcps.keys())
+        return list(self.entries.keys())
+    
+    def get_client(self, mcp_name: str) -> Optional[Client]:
+        """Get the connected client for an MCP, or None if it isn't loaded."""
+        entry = self.entries.get(mcp_name)
+        return entry.client if entry is not None else None
     
     def _is_connection_error(self, error: Exception) -> bool:
         """Check if error is connection-related (worth retrying)."""
-        connection_error_types = (
-            ConnectionError,
-            ConnectionRefusedError,
-            ConnectionResetError,
-            TimeoutError,
-            OSError,
-        )
-        
-        if isinstance(error, connection_error_types):
+        if isinstance(error, _CONNECTION_ERROR_TYPES):
             return True
-        
-        error_msg = str(error).lower()
-        connection_keywords = [
-            "connection refused", "connection reset", "connection closed",
-            "connect timeout", "timed out", "network unreachable",
-            "host unreachable", "no route to host", "broken pipe",
-            "all connection attempts failed", "client is not connected"
-        ]
-        
-        return any(keyword in error_msg for keyword in connection_keywords)
+        return _CONNECTION_ERROR_RE.search(str(error)) is not None
     
     async def _save_tools_to_db(self, mcp_id: int, tools: List[Dict], db: AsyncSession):
-        """Save tools to database."""
+        """Upsert the discovered tools in one statement and drop the ones that went away."""
         try:
-            # Delete old tools
-            await db.execute(
-                delete(MCPTool).where(MCPTool.mcp_server_id == mcp_id)
-            )
+            # Keyed by name: ON CONFLICT cannot touch the same row twice in one INSERT
+            rows = {
+                tool['name']: {
+                    'mcp_server_id': mcp_id,
+                    'name': tool['name'],
+                    'description': tool.get('description'),
+                    'input_schema': tool.get('inputSchema'),
+                }
+                for tool in tools
+            }
             
-            # Insert new tools
-            for tool in tools:
-                db_tool = MCPTool(
-                    mcp_server_id=mcp_id,
-                    name=tool['name'],
-                    description=tool.get('description'),
-                    input_schema=tool.get('inputSchema')
-                )
-                db.add(db_tool)
+            stale = delete(MCPTool).where(MCPTool.mcp_server_id == mcp_id)
+            if not rows:
+                await db.execute(stale)
+                await db.commit()
+                return
+            
+            try:
+                # SAVEPOINT: a failed upsert must not roll back (and expire) the caller's session
+                async with db.begin_nested():
+                    await db.execute(stale.where(MCPTool.name.notin_(list(rows))))
+                    stmt = pg_insert(MCPTool).values(list(rows.values()))
+                    await db.execute(
+                        stmt.on_conflict_do_update(
+                            index_elements=['mcp_server_id', 'name'],
+                            set_={
+                                'description': stmt.excluded.description,
+                                'input_schema': stmt.excluded.input_schema,
+                            },
+                        )
+                    )
+            except ProgrammingError:
+                # Schema without uq_mcp_tool: replace the server's rows with one executemany
+                await db.execute(stale)
+                await db.execute(_INSERT_TOOL, list(rows.values()))
             
             await db.commit()
         except Exception as e:
@@ -626,9 +1028,8 @@ class MCPRegistry:
             except:
                 pass
     
-    async def _log_health(
+    def _log_health(
         self, 
-        db: AsyncSession, 
         mcp_id: int, 
         status: str,
         response_time_ms: Optional[int] = None,
@@ -636,38 +1037,78 @@ class MCPRegistry:
         event_type: str = 'health_check',
         metadata: Optional[Dict] = None
     ):
-        """Log health event."""
+        """Queue a health event for the background writer."""
+        if self._health_writer_task is None or self._health_writer_task.done():
+            self._health_writer_task = asyncio.create_task(self._health_log_writer())
         try:
-            log = MCPHealthLog(
-                mcp_server_id=mcp_id,
-                status=status,
-                response_time_ms=response_time_ms,
-                error_message=error_message,
-                event_type=event_type,
-                metadata=metadata
-            )
-            db.add(log)
-            await db.commit()
-        except Exception as e:
-            logger.warning(f"Failed to log health event", mcp_id=mcp_id, error=str(e))
+            self._health_log_queue.put_nowait({
+                'mcp_server_id': mcp_id,
+                'status': status,
+                'response_time_ms': response_time_ms,
+                'error_message': error_message,
+                'event_type': event_type,
+                'meta_data': metadata,
+            })
+        except asyncio.QueueFull:
+            logger.warning("Health log queue full, dropping event", mcp_id=mcp_id, event_type=event_type)
+    
+    async def _health_log_writer(self):
+        """Drain queued health events and insert each batch with one statement."""
+        queue = self._health_log_queue
+        while True:
+            batch = [await queue.get()]
+            # Let events from the same polling sweep join this batch
+            if queue.qsize() < self.health_log_batch_size - 1:
+                await asyncio.sleep(self.health_log_flush_interval)
+            while len(batch) < self.health_log_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
             try:
-                await db.rollback()
-            except:
-                pass
+                await self._flush_health_logs(batch)
+            except Exception as e:
+                logger.warning("Failed to write health log batch", count=len(batch), error=str(e))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def _flush_health_logs(self, batch: List[Dict]):
+        """Insert one batch of health log rows."""
+        from app import database
+        
+        async with database.AsyncSessionLocal() as db:
+            await db.execute(insert(MCPHealthLog), batch)
+            await db.commit()
     
     async def close_all(self):
         """Close all MCP connections."""
         logger.info("🔌 Closing all MCP connections")
-        for name, client in self.mcps.items():
+        names = list(self.entries)
+        results = await asyncio.gather(
+            *(entry.client.__aexit__(None, None, None) for entry in self.entries.values()),
+            return_exceptions=True,
+        )
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error closing {name}", error=str(result))
+        self.entries.clear()
+        self._auth_cache.clear()
+        self._expires_at.clear()
+        self._expiry_heap.clear()
+    
+    async def aclose(self):
+        """Close all MCP connections and the shared HTTP connection pool."""
+        await self.close_all()
+        if self._health_writer_task is not None:
             try:
-                await client.__aexit__(None, None, None)
-            except Exception as e:
-                logger.error(f"Error closing {name}", error=str(e))
-        self.mcps.clear()
-        self.tools_cache.clear()
-        self.prompts_cache.clear()
-        self.resources_cache.clear()
-        self.connected_at.clear()
+                await asyncio.wait_for(self._health_log_queue.join(), timeout=5)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Pending health log rows dropped on shutdown",
+                               pending=self._health_log_queue.qsize())
+            self._health_writer_task.cancel()
+            try:
+                await self._health_writer_task
+            except asyncio.CancelledError:
+                pass
+        await self._http_pool.close_pool()
 
 
 # Global instance
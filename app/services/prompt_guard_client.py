@@ -6,34 +6,60 @@ Provides async interface for checking prompts.
 """
 
 import asyncio
-import json
-import uuid
-from typing import Dict, Any, Optional
+import itertools
+import os
+import time
+import weakref
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 from redis.asyncio import Redis
 
+from app.services.pubsub_hub import get_pubsub_hub
 from app.utils.logger import logger
 
+RESPONSE_CHANNEL = "prompt_guard_response"
+CHECK_CHANNEL = "prompt_guard_check"
+# Check requests have a fixed shape; only the values are serialized per call
+_CHECK_REQUEST_TEMPLATE = b'{"request_id":"%s","user_id":%s,"message":%s}'
+
 
 class PromptGuardClient:
     """Client for prompt guard service via Redis pub/sub."""
     
-    def __init__(self, redis_client: Redis):
+    def __init__(
+        self,
+        redis_client: Redis,
+        publish_batch_size: int = 64,
+        publish_flush_interval_ms: float = 2.0,
+    ):
         self.redis = redis_client
-        self.pubsub = None
-        self._pending_requests: Dict[str, asyncio.Future] = {}
-        self._listener_task: Optional[asyncio.Task] = None
+        # Weak values: an abandoned check's future drops out once nothing awaits it
+        self._pending_requests: "weakref.WeakValueDictionary[str, asyncio.Future]" = (
+            weakref.WeakValueDictionary()
+        )
+        # Request ids only need to be unique among clients sharing the response channel
+        self._request_id_prefix = f"{os.getpid():x}-{os.urandom(4).hex()}-"
+        self._request_counter = itertools.count()
+        self._subscribed = False
         self._enabled = True
+        # Concurrent check requests are coalesced into one pipelined PUBLISH batch
+        self.publish_batch_size = publish_batch_size
+        self.publish_flush_interval = publish_flush_interval_ms / 1000
+        self._publish_queue: asyncio.Queue[Tuple[str, bytes, asyncio.Future]] = asyncio.Queue()
+        self._publisher_task: Optional[asyncio.Task] = None
     
     async def start(self):
-        """Start listening for responses."""
-        if self._listener_task:
+        """Start listening for responses on the shared pub/sub connection."""
+        if self._subscribed:
             logger.warning("[PROMPT-GUARD] Listener already running")
             return
         
         try:
-            self.pubsub = self.redis.pubsub()
-            await self.pubsub.subscribe("prompt_guard_response")
-            self._listener_task = asyncio.create_task(self._listen_for_responses())
+            await get_pubsub_hub(self.redis).subscribe(
+                RESPONSE_CHANNEL, self._handle_response, "PROMPT-GUARD"
+            )
+            self._subscribed = True
+            self._publisher_task = asyncio.create_task(self._publish_batches())
             logger.info("[PROMPT-GUARD] ✅ Client started")
         except Exception as e:
             logger.error(f"[PROMPT-GUARD] Failed to start: {e}")
@@ -41,16 +67,22 @@ class PromptGuardClient:
     
     async def stop(self):
         """Stop listening for responses."""
-        if self._listener_task:
-            self._listener_task.cancel()
+        if self._publisher_task:
+            self._publisher_task.cancel()
             try:
-                await self._listener_task
+                await self._publisher_task
             except asyncio.CancelledError:
                 pass
+            self._publisher_task = None
+        # Callers still waiting on a publish fail open instead of hanging
+        while not self._publish_queue.empty():
+            _, _, done = self._publish_queue.get_nowait()
+            if not done.done():
+                done.set_exception(RuntimeError("Prompt guard client stopped"))
         
-        if self.pubsub:
-            await self.pubsub.unsubscribe()
-            await self.pubsub.close()
+        if self._subscribed:
+            await get_pubsub_hub(self.redis).unsubscribe(RESPONSE_CHANNEL, self._handle_response)
+            self._subscribed = False
         
         logger.info("[PROMPT-GUARD] ✅ Client stopped")
     
@@ -89,27 +121,28 @@ class PromptGuardClient:
                 "latency_ms": 0,
             }
         
-        request_id = str(uuid.uuid4())
+        request_id = f"{self._request_id_prefix}{next(self._request_counter):x}"
         
         # Create future for response
         future = asyncio.Future()
         self._pending_requests[request_id] = future
         
         try:
-            # Publish check request
-            request = {
-                "request_id": request_id,
-                "user_id": user_id,
-                "message": message,
-            }
-            
-            await self.redis.publish(
-                "prompt_guard_check",
-                json.dumps(request),
+            # Publish check request (request_id never needs JSON escaping)
+            payload = _CHECK_REQUEST_TEMPLATE % (
+                request_id.encode(),
+                orjson.dumps(user_id),
+                orjson.dumps(message),
             )
             
+            # Publishing and the response share one timeout, so a stalled
+            # pipeline fails open like a slow guard does
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout
+            await asyncio.wait_for(self._publish(CHECK_CHANNEL, payload), timeout=timeout)
+            
             # Wait for response with timeout
-            result = await asyncio.wait_for(future, timeout=timeout)
+            result = await asyncio.wait_for(future, timeout=max(deadline - loop.time(), 0))
             return result
             
         except asyncio.TimeoutError:
@@ -142,42 +175,60 @@ class PromptGuardClient:
             # Cleanup
             self._pending_requests.pop(request_id, None)
     
-    async def _listen_for_responses(self):
-        """Background task listening for responses."""
-        logger.info("[PROMPT-GUARD] 🎧 Listening for responses...")
+    async def _publish(self, channel: str, payload: bytes):
+        """Publish through the batching task, or directly if it isn't running."""
+        if self._publisher_task is None or self._publisher_task.done():
+            await self.redis.publish(channel, payload)
+            return
         
-        try:
-            async for message in self.pubsub.listen():
-                if message["type"] != "message":
-                    continue
-                
-                try:
-                    data = json.loads(message["data"])
-                    request_id = data.get("request_id")
-                    result = data.get("result")
-                    
-                    if request_id in self._pending_requests:
-                        future = self._pending_requests[request_id]
-                        if not future.done():
-                            future.set_result(result)
+        done = asyncio.get_running_loop().create_future()
+        self._publish_queue.put_nowait((channel, payload, done))
+        await done
+    
+    async def _publish_batches(self):
+        """Send queued publishes in pipelines: one round-trip per flush window."""
+        queue = self._publish_queue
+        while True:
+            batch: List[Tuple[str, bytes, asyncio.Future]] = []
+            try:
+                batch.append(await queue.get())
+                # Give concurrent callers one flush window to join the batch
+                if queue.empty():
+                    await asyncio.sleep(self.publish_flush_interval)
+                while len(batch) < self.publish_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
                 
-                except json.JSONDecodeError as e:
-                    logger.error(f"[PROMPT-GUARD] Invalid JSON: {e}")
-                except Exception as e:
-                    logger.error(f"[PROMPT-GUARD] Error handling response: {e}")
-        
-        except asyncio.CancelledError:
-            logger.info("[PROMPT-GUARD] Listener cancelled")
-            raise
-        except Exception as e:
-            logger.error(f"[PROMPT-GUARD] Fatal listener error: {e}", exc_info=True)
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for channel, payload, _ in batch:
+                        pipe.publish(channel, payload)
+                    await pipe.execute()
+            except Exception as e:
+                logger.error(f"[PROMPT-GUARD] Publish batch failed: {e}")
+                for _, _, done in batch:
+                    if not done.done():
+                        done.set_exception(e)
+            else:
+                for _, _, done in batch:
+                    if not done.done():
+                        done.set_result(None)
+            finally:
+                # Only reached with unresolved entries when cancelled mid-batch
+                for _, _, done in batch:
+                    if not done.done():
+                        done.set_exception(RuntimeError("Prompt guard client stopped"))
+    
+    async def _handle_response(self, data: Dict[str, Any]):
+        """Resolve the pending check a guard response belongs to."""
+        future = self._pending_requests.get(data.get("request_id"))
+        if future is not None and not future.done():
+            future.set_result(data.get("result"))
     
     async def reload_config(self):
         """Trigger configuration reload in guard service."""
         try:
             await self.redis.publish(
                 "prompt_guard_config_reload",
-                json.dumps({"timestamp": asyncio.get_event_loop().time()}),
+                orjson.dumps({"timestamp": time.monotonic()}),
             )
             logger.info("[PROMPT-GUARD] Config reload triggered")
         except Exception as e:
@@ -0,0 +1,272 @@
+"""
+Redis Pub/Sub Hub
+
+Multiplexes every pub/sub channel this process listens to onto a single
+Redis connection. Listeners register a handler per channel; one reader task
+parses each message once and queues it for that channel's worker task, so a
+slow handler on one channel never delays delivery on another.
+
+Reconnects use exponential backoff with jitter (capped at 60s) and
+resubscribe every registered channel, so individual listeners carry no
+retry logic of their own. Connection health is reported per listener name
+through the registry in redis_listener_base.
+"""
+
+import asyncio
+import random
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import orjson
+from redis.asyncio import ConnectionPool, Redis
+
+from app.services.redis_listener_base import _broadcast_health, _listener_statuses, _now_iso
+from app.utils.logger import logger
+
+
+Handler = Callable[[dict[str, Any]], Awaitable[None]]
+
+# Per-channel backlog; beyond this, messages for a stalled channel are dropped
+_CHANNEL_QUEUE_SIZE = 1000
+
+# Keys kept across status transitions; everything else is per-state detail
+_SNAPSHOT_KEYS = frozenset({"component", "channel", "status", "reconnect_count"})
+
+
+class PubSubHub:
+    """One Redis pub/sub connection shared by all channel listeners."""
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        initial_backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        self.redis = redis_client
+        # Same server settings, but payloads stay bytes: orjson parses them
+        # directly, skipping a str decode per message
+        pool = redis_client.connection_pool
+        self._reader_pool = ConnectionPool(
+            connection_class=pool.connection_class,
+            **{**pool.connection_kwargs, "decode_responses": False},
+        )
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._handlers: Dict[str, List[Tuple[str, Handler]]] = {}
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+        # The reader only enqueues; each channel's handlers run on its own worker
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def subscribe(self, channel: str, handler: Handler, name: str) -> None:
+        """
+        Call handler with the parsed JSON of every message on channel.
+
+        Args:
+            channel: Redis pub/sub channel name.
+            handler: Async callable receiving the parsed message dict.
+            name:    Label used in logs and the listener health registry.
+        """
+        handlers = self._handlers.setdefault(channel, [])
+        handlers.append((name, handler))
+        logger.info(f"[PUBSUB-HUB] {name} registered on '{channel}'")
+        self._ensure_worker(channel)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        elif self._pubsub is not None and len(handlers) == 1:
+            try:
+                await self._pubsub.subscribe(channel)
+            except Exception as exc:
+                # The reader resubscribes every registered channel when it reconnects
+                logger.warning(f"[PUBSUB-HUB] Deferred subscribe to '{channel}': {exc}")
+
+    async def unsubscribe(self, channel: str, handler: Handler) -> None:
+        """Remove a handler; the channel is dropped once it has no handlers left."""
+        handlers = self._handlers.get(channel)
+        if not handlers:
+            return
+
+        remaining = [(name, h) for name, h in handlers if h != handler]
+        for name, h in handlers:
+            if h == handler:
+                _listener_statuses.pop(name, None)
+        if remaining:
+            self._handlers[channel] = remaining
+            return
+
+        del self._handlers[channel]
+        await self._stop_worker(channel)
+        if not self._handlers:
+            await self.close()
+        elif self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(channel)
+            except Exception:
+                pass
+
+    async def close(self) -> None:
+        """Stop the reader and channel workers and close the shared connection."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for channel in list(self._workers):
+            await self._stop_worker(channel)
+        await self._reader_pool.disconnect()
+
+    def _ensure_worker(self, channel: str) -> None:
+        """Start the delivery worker for channel if it isn't running."""
+        worker = self._workers.get(channel)
+        if worker is None or worker.done():
+            queue = self._queues.setdefault(channel, asyncio.Queue(maxsize=_CHANNEL_QUEUE_SIZE))
+            self._workers[channel] = asyncio.create_task(self._deliver(channel, queue))
+
+    async def _stop_worker(self, channel: str) -> None:
+        """Cancel channel's worker and discard its undelivered messages."""
+        self._queues.pop(channel, None)
+        worker = self._workers.pop(channel, None)
+        if worker is not None:
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """Read the shared connection, reconnecting with backoff until nothing is subscribed."""
+        backoff = self.initial_backoff
+        reconnect_count = 0
+
+        while self._handlers:
+            pubsub = None
+            try:
+                pubsub = Redis(connection_pool=self._reader_pool).pubsub()
+                # Published before subscribing so a concurrent subscribe() lands on this connection
+                self._pubsub = pubsub
+                await pubsub.subscribe(*list(self._handlers))
+                logger.info(f"[PUBSUB-HUB] Subscribed to {sorted(self._handlers)}")
+
+                await self._set_status("connected", reconnect_count, connected_at=_now_iso())
+                backoff = self.initial_backoff  # reset on successful connect
+
+                # listen() ends once every channel has been unsubscribed
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        await self._dispatch(message)
+
+            except asyncio.CancelledError:
+                logger.info("[PUBSUB-HUB] Reader cancelled (clean shutdown)")
+                await self._set_status("stopped", reconnect_count, stopped_at=_now_iso(), broadcast=False)
+                break  # do not retry on clean cancel
+
+            except Exception as exc:
+                reconnect_count += 1
+                # Jittered so processes that lost Redis together don't reconnect in lockstep
+                delay = random.uniform(self.initial_backoff, min(backoff * 3, self.max_backoff))
+                await self._set_status(
+                    "reconnecting",
+                    reconnect_count,
+                    disconnected_at=_now_iso(),
+                    retry_in_seconds=int(delay),
+                    error=str(exc),
+                )
+                logger.error(
+                    f"[PUBSUB-HUB] Redis connection lost: {exc}. "
+                    f"Reconnecting in {delay:.0f}s"
+                )
+                await asyncio.sleep(delay)
+                backoff = min(backoff * 2, self.max_backoff)
+
+            finally:
+                self._pubsub = None
+                if pubsub is not None:
+                    try:
+                        await pubsub.unsubscribe()
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+        logger.info("[PUBSUB-HUB] Reader stopped")
+
+    async def _dispatch(self, message: dict[str, Any]) -> None:
+        """Parse one message and queue it for its channel's worker (never awaits handlers)."""
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        queue = self._queues.get(channel)
+        if queue is None:
+            return
+
+        try:
+            data = orjson.loads(message["data"])
+        except orjson.JSONDecodeError as exc:
+            logger.error(f"[PUBSUB-HUB] Invalid JSON on '{channel}': {exc}")
+            return
+
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            logger.warning(f"[PUBSUB-HUB] '{channel}' handlers are stalled, dropping message")
+
+    async def _deliver(self, channel: str, queue: asyncio.Queue) -> None:
+        """Hand each queued message on channel to every handler registered for it."""
+        while True:
+            data = await queue.get()
+            for name, handler in list(self._handlers.get(channel, ())):
+                try:
+                    await handler(data)
+                except Exception as exc:
+                    logger.error(f"[{name}] Handler error on '{channel}': {exc}")
+
+    async def _set_status(
+        self, status: str, reconnect_count: int, broadcast: bool = True, **extra: Any
+    ) -> None:
+        """Update the shared connection state under every registered listener name.
+
+        Each listener keeps one snapshot dict that is updated in place; a
+        health event is broadcast only when the status actually changes.
+        """
+        for channel, handlers in list(self._handlers.items()):
+            for name, _ in handlers:
+                snapshot = _listener_statuses.get(name)
+                if snapshot is None or snapshot.get("channel") != channel:
+                    snapshot = _listener_statuses[name] = {"component": name, "channel": channel}
+                changed = snapshot.get("status") != status
+                # Timestamps and error details describe the previous state only
+                for key in snapshot.keys() - _SNAPSHOT_KEYS:
+                    del snapshot[key]
+                snapshot["status"] = status
+                snapshot["reconnect_count"] = reconnect_count
+                snapshot.update(extra)
+                if broadcast and changed:
+                    # Broadcasting writes to dashboard sockets; keep it off the reader
+                    task = asyncio.create_task(_broadcast_health(name))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+
+
+# Global instance
+_hub: Optional[PubSubHub] = None
+
+
+def get_pubsub_hub(redis_client: Optional[Redis] = None) -> PubSubHub:
+    """Get the process-wide hub, creating it on first use with redis_client."""
+    global _hub
+    if _hub is None:
+        if redis_client is None:
+            raise RuntimeError("PubSubHub not initialized. Pass a Redis client on first use.")
+        _hub = PubSubHub(redis_client)
+    return _hub
+
+
+async def close_pubsub_hub() -> None:
+    """Close the hub if one was created."""
+    global _hub
+    if _hub is not None:
+        await _hub.close()
+        _hub = None
@@ -2,14 +2,58 @@
 Subscription Manager - Handles WebSocket event subscriptions and filtering
 """
 
+import time
 import uuid
-from typing import Dict, List, Any, Set
+from typing import Callable, Dict, FrozenSet, List, Any
 from dataclasses import dataclass, field
 from app.services.event_registry import get_event_type, EventType
 from app.utils.logger import logger
 
 logger = logger.bind(service="SubscriptionManager")
 
+Matcher = Callable[[Dict[str, Any]], bool]
+
+# Multiselect filters: an event passes when the field is missing or listed
+_MEMBERSHIP_FILTERS = ("mcp_names", "severity", "state", "health_status")
+_MEMBERSHIP_FIELDS = {"mcp_names": "mcp_name"}
+# Select filters: the event field must equal the filter value
+_EQUALITY_FILTERS = ("old_status", "new_status")
+
+
+def _as_lookup(value: Any) -> Any:
+    """Freeze list-valued filters for O(1) membership; other values are used as-is"""
+    if isinstance(value, (list, tuple, set)):
+        try:
+            return frozenset(value)
+        except TypeError:
+            return value
+    return value
+
+
+def _build_matchers(filters: Dict[str, Any]) -> List[Matcher]:
+    """Bind one predicate per active filter so matching skips unused filters"""
+    matchers: List[Matcher] = []
+    
+    for name in _MEMBERSHIP_FILTERS:
+        if filters.get(name):
+            key = _MEMBERSHIP_FIELDS.get(name, name)
+            allowed = _as_lookup(filters[name])
+            matchers.append(
+                lambda d, k=key, a=allowed: not (v := d.get(k)) or v in a
+            )
+    
+    for name in _EQUALITY_FILTERS:
+        if filters.get(name):
+            expected = filters[name]
+            matchers.append(lambda d, k=name, e=expected: d.get(k) == e)
+    
+    # Filter: failure_cycles (number - minimum)
+    if filters.get("failure_cycles"):
+        minimum = filters["failure_cycles"]
+        matchers.append(lambda d, m=minimum: d.get("failure_cycles", 0) >= m)
+    
+    return matchers
+
 
 @dataclass
 class Subscription:
@@ -18,7 +62,13 @@ class Subscription:
     conn_id: str
     event_types: List[str]
     filters: Dict[str, Any] = field(default_factory=dict)
-    created_at: float = field(default_factory=lambda: __import__('time').time())
+    created_at: float = field(default_factory=time.time)
+    event_type_set: FrozenSet[str] = field(init=False, repr=False)
+    matchers: List[Matcher] = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.event_type_set = frozenset(self.event_types)
+        self.matchers = _build_matchers(self.filters)
 
 
 class SubscriptionManager:
@@ -27,6 +77,8 @@ class SubscriptionManager:
     def __init__(self):
         # conn_id -> List[Subscription]
         self.subscriptions: Dict[str, List[Subscription]] = {}
+        # event_type -> conn_id -> subscriptions covering that event type
+        self._by_event: Dict[str, Dict[str, List[Subscription]]] = {}
     
     def create_subscription(
         self,
@@ -48,6 +100,8 @@ class SubscriptionManager:
             self.subscriptions[conn_id] = []
         
         self.subscriptions[conn_id].append(subscription)
+        for event_type in subscription.event_type_set:
+            self._by_event.setdefault(event_type, {}).setdefault(conn_id, []).append(subscription)
         
         logger.info(
             "Subscription created",
@@ -66,6 +120,9 @@ class SubscriptionManager:
         
         subs = self.subscriptions[conn_id]
         self.subscriptions[conn_id] = [s for s in subs if s.id != sub_id]
+        for sub in subs:
+            if sub.id == sub_id:
+                self._unindex(sub)
         
         logger.info("Subscription removed", sub_id=sub_id, conn_id=conn_id)
         return True
@@ -74,9 +131,27 @@ class SubscriptionManager:
         """Remove all subscriptions for a connection"""
         if conn_id in self.subscriptions:
             count = len(self.subscriptions[conn_id])
-            del self.subscriptions[conn_id]
+            for sub in self.subscriptions.pop(conn_id):
+                self._unindex(sub)
             logger.info("All subscriptions removed", conn_id=conn_id, count=count)
     
+    def _unindex(self, subscription: Subscription):
+        """Drop a subscription from the event-type index"""
+        for event_type in subscription.event_type_set:
+            by_conn = self._by_event.get(event_type)
+            if by_conn is None:
+                continue
+            subs = by_conn.get(subscription.conn_id)
+            if subs is None:
+                continue
+            subs = [s for s in subs if s is not subscription]
+            if subs:
+                by_conn[subscription.conn_id] = subs
+            else:
+                del by_conn[subscription.conn_id]
+                if not by_conn:
+                    del self._by_event[event_type]
+    
     def get_subscriptions(self, conn_id: str) -> List[Subscription]:
         """Get all subscriptions for a connection"""
         return self.subscriptions.get(conn_id, [])
@@ -85,14 +160,16 @@ class SubscriptionManager:
         self,
         event_type: str,
         event_data: Dict[str, Any]
-    ) -> Set[str]:
+    ) -> List[str]:
         """Get connection IDs that should receive this event"""
-        matching_conns = set()
+        matching_conns: List[str] = []
         
-        for conn_id, subs in self.subscriptions.items():
+        # Only connections with a subscription to this event type are considered;
+        # the index is keyed by conn_id, so each connection appears at most once
+        for conn_id, subs in self._by_event.get(event_type, {}).items():
             for sub in subs:
                 if self._matches_subscription(event_type, event_data, sub):
-                    matching_conns.add(conn_id)
+                    matching_conns.append(conn_id)
                     break
         
         if matching_conns:
@@ -108,56 +185,18 @@ class SubscriptionManager:
     ) -> bool:
         """Check if event matches subscription criteria"""
         # Check if event type is subscribed
-        if event_type not in subscription.event_types:
+        if event_type not in subscription.event_type_set:
             return False
         
-        # Apply filters
-        filters = subscription.filters
-        
-        # Filter: mcp_names (multiselect)
-        if "mcp_names" in filters and filters["mcp_names"]:
-            mcp_name = event_data.get("mcp_name")
-            if mcp_name and mcp_name not in filters["mcp_names"]:
-                return False
-        
-        # Filter: severity (multiselect)
-        if "severity" in filters and filters["severity"]:
-            severity = event_data.get("severity")
-            if severity and severity not in filters["severity"]:
-                return False
-        
-        # Filter: old_status (select)
-        if "old_status" in filters and filters["old_status"]:
-            old_status = event_data.get("old_status")
-            if old_status != filters["old_status"]:
-                return False
+        # Unfiltered subscriptions match every event of their types
+        matchers = subscription.matchers
+        if not matchers:
+            return True
         
-        # Filter: new_status (select)
-        if "new_status" in filters and filters["new_status"]:
-            new_status = event_data.get("new_status")
-            if new_status != filters["new_status"]:
-                return False
-        
-        # Filter: state (circuit breaker state)
-        if "state" in filters and filters["state"]:
-            state = event_data.get("state")
-            if state and state not in filters["state"]:
-                return False
-        
-        # Filter: health_status
-        if "health_status" in filters and filters["health_status"]:
-            health_status = event_data.get("health_status")
-            if health_status and health_status not in filters["health_status"]:
-                return False
-        
-        # Filter: failure_cycles (number - minimum)
-        if "failure_cycles" in filters and filters["failure_cycles"]:
-            failure_cycles = event_data.get("failure_cycles", 0)
-            if failure_cycles < filters["failure_cycles"]:
-                return False
-        
-        # All filters passed
-        return True
+        # Filters were compiled into matchers when the subscription was created
+        if len(matchers) == 1:
+            return matchers[0](event_data)
+        return all(m(event_data) for m in matchers)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get subscription statistics"""
@@ -31,7 +31,7 @@ class ToolCache:
         """
         self.max_size = max_size
         self.default_ttl = default_ttl
-        self.cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.cache: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
         self.stats = {
             "hits": 0,
             "misses": 0,
@@ -64,12 +64,13 @@ class ToolCache:
         self.cache.clear()
         logger.info("🛑 Tool Cache stopped")
         
-    def _generate_cache_key(self, mcp_name: str, tool_name: str, arguments: Dict) -> str:
+    def _generate_cache_key(self, mcp_name: str, tool_name: str, arguments: Dict) -> bytes:
         """Generate cache key from MCP name, tool name, and arguments."""
         # Sort arguments for consistent hashing
         args_str = json.dumps(arguments, sort_keys=True)
         key_str = f"{mcp_name}:{tool_name}:{args_str}"
-        return hashlib.sha256(key_str.encode()).hexdigest()
+        # Keys never leave this process, so a short blake2b digest is enough
+        return hashlib.blake2b(key_str.encode(), digest_size=16).digest()
         
     async def get(self, mcp_name: str, tool_name: str, arguments: Dict) -> Optional[Any]:
         """
@@ -126,7 +126,7 @@ class PermissionChecker:
         tool_restrictions = role.get("tool_restrictions", {})
         mcp_restrictions = tool_restrictions.get(mcp_name, {})
         mode = mcp_restrictions.get("mode", "all")
-        restricted_tools = mcp_restrictions.get("tools", [])
+        restricted_tools = frozenset(mcp_restrictions.get("tools", []))
         
         if mode == "all":
             return all_tools
@@ -0,0 +1,10 @@
+-- ============================================================
+-- MCP Servers: active catalog index
+-- ============================================================
+-- Covers the gateway's active-catalog query
+-- (WHERE status = 'active' ORDER BY name).
+-- Safe to run multiple times (uses IF NOT EXISTS).
+-- ============================================================
+
+CREATE INDEX IF NOT EXISTS idx_mcp_servers_status_name
+    ON mcp_servers(status, name);
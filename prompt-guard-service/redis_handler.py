@@ -5,7 +5,7 @@ Listens for check requests and publishes results.
 """
 
 import redis.asyncio as redis
-import json
+import orjson
 import asyncio
 from typing import Dict, Any
 
@@ -157,7 +157,7 @@ class RedisHandler:
                     channel = message["channel"]
                     
                     try:
-                        data = json.loads(message["data"])
+                        data = orjson.loads(message["data"])
                         
                         if channel == "prompt_guard_check":
                             await self._handle_check_request(data)
@@ -165,7 +165,7 @@ class RedisHandler:
                         elif channel == "prompt_guard_config_reload":
                             await self._handle_config_reload(data)
                         
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         logger.error(f"Invalid JSON in message: {e}")
                     except Exception as e:
                         logger.error(f"Error handling message: {e}", exc_info=True)
@@ -180,7 +180,7 @@ class RedisHandler:
                 await asyncio.sleep(5)  # Wait before retrying
                 continue
     
-    async def _publish_with_retry(self, channel: str, data: str, max_retries: int = 3) -> bool:
+    async def _publish_with_retry(self, channel: str, data: bytes, max_retries: int = 3) -> bool:
         """Publish message with retry logic."""
         for attempt in range(max_retries):
             try:
@@ -230,7 +230,7 @@ class RedisHandler:
         
         success = await self._publish_with_retry(
             "prompt_guard_response",
-            json.dumps(response)
+            orjson.dumps(response)
         )
         
         if success: